@@ -0,0 +1,39 @@
+# See LICENSE.incore for license details
+"""Tests of the helpers of uatg.utils."""
+
+import unittest
+from multiprocessing import Pool
+from os import listdir
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from uatg.utils import dump_json_cache, load_json_cache
+
+# contents of the cache written by every writer, as the workers persisting the
+# same page layout write the same data
+cache_data = {'code': ['la t0, l1_pt'] * 64, 'data': '.dword 0\n' * 512}
+
+
+def write_cache(path):
+    """
+        writes the cache_data to path a few times, like a pool worker.
+    """
+    for _ in range(20):
+        dump_json_cache(path, cache_data)
+
+
+class TestDumpJsonCache(unittest.TestCase):
+
+    def test_concurrent_writers(self):
+        with TemporaryDirectory() as cache_dir:
+            path = join(cache_dir, 'pages', 'layout.json')
+            with Pool(8) as pool:
+                pool.map(write_cache, [path] * 16)
+            self.assertEqual(load_json_cache(path), cache_data)
+            # none of the temporary files is left behind
+            self.assertEqual(listdir(join(cache_dir, 'pages')),
+                             ['layout.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
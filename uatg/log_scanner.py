@@ -0,0 +1,267 @@
+# See LICENSE.incore for license details
+"""Single pass scanner of the DUT logs checked by the plugins."""
+
+import gzip
+from contextlib import contextmanager
+from io import BufferedReader
+from mmap import mmap, ACCESS_READ
+from os.path import join, isfile
+from re import compile as re_compile, DOTALL, MULTILINE, UNICODE
+from shutil import copyfileobj
+from tempfile import TemporaryDirectory
+
+from uatg.regex_formats import bpu_prefix, bpu_prefilter, bpu_formats, \
+    classify_bpu_line
+
+# names of the BPU formats, keyed by the bytes pattern of the format
+bpu_format_names = {(bpu_prefix + line_format).encode(): name
+                    for name, line_format in bpu_formats.items()}
+# names of the log of a test, in the order they are looked for. The DUT log
+# can be compressed using gzip or zstd.
+log_names = ('log', 'log.gz', 'log.zst')
+# syntax which lets a pattern match across the lines of a log: a newline, a
+# class which matches a newline, or an anchor to the start or end of the log
+multiline_syntax = re_compile(rb'\\[nsWDAZ]|\n|\[\^')
+# anchors which match at the start or end of every line only in MULTILINE mode
+line_anchors = re_compile(rb'(?<!\\)[\^$]')
+
+
+def compile_patterns(patterns):
+    """
+        returns the patterns, keyed by their names, compiled to match the bytes
+        read from a log. A pattern can be a string or a compiled pattern, whose
+        flags are kept.
+    """
+    compiled = {}
+    for name, pattern in patterns.items():
+        flags = 0
+        if hasattr(pattern, 'pattern'):
+            # bytes patterns do not take the UNICODE flag of str patterns
+            flags = pattern.flags & ~UNICODE
+            pattern = pattern.pattern
+        if isinstance(pattern, str):
+            pattern = pattern.encode()
+        compiled[name] = re_compile(pattern, flags)
+    return compiled
+
+
+def spans_lines(pattern):
+    """
+        returns True when a compiled pattern may match across the lines of a
+        log, or may find other matches in a line than in the whole log. Such
+        patterns are matched over the whole log instead of line by line. The
+        check is conservative, and only looks at the flags and the syntax of
+        the pattern.
+    """
+    if pattern.flags & DOTALL or multiline_syntax.search(pattern.pattern):
+        return True
+    return not pattern.flags & MULTILINE and \
+        line_anchors.search(pattern.pattern) is not None
+
+
+def find_log(test_dir):
+    """
+        returns the path to the log of a test in test_dir, which is the first
+        of the log_names found. The path to the uncompressed log is returned
+        when no log is found.
+    """
+    for name in log_names:
+        if isfile(join(test_dir, name)):
+            return join(test_dir, name)
+    return join(test_dir, log_names[0])
+
+
+def is_compressed(log_file_path):
+    """
+        returns True when the log is compressed using gzip or zstd.
+    """
+    return log_file_path.endswith(('.gz', '.zst'))
+
+
+def open_log(log_file_path):
+    """
+        opens a log for reading as bytes. A compressed log is decompressed as
+        it is read, so that it is never decompressed to the disk or into
+        memory as a whole. The zstandard package is needed to read the .zst
+        logs, and is imported only when such a log is opened.
+    """
+    if log_file_path.endswith('.gz'):
+        return gzip.open(log_file_path, 'rb')
+    if log_file_path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f'The zstandard package is needed to read '
+                              f'{log_file_path}. Install it using pip '
+                              f'install zstandard') from None
+        return BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+            open(log_file_path, 'rb'), read_across_frames=True,
+            closefd=True))
+    return open(log_file_path, 'rb')
+
+
+@contextmanager
+def readable_log(log_file_path):
+    """
+        yields a path from which the log can be read as plain text, for the
+        plugins which open the log themselves. A compressed log is streamed
+        into a temporary file, which is deleted once the plugin returns. The
+        temporary file can be opened, sized and seeked like the plain log.
+    """
+    if not is_compressed(log_file_path):
+        yield log_file_path
+        return
+
+    with open_log(log_file_path) as source, \
+            TemporaryDirectory(prefix='uatg_log_') as log_dir:
+        plain_log_path = join(log_dir, log_names[0])
+        with open(plain_log_path, 'wb') as plain_log:
+            copyfileobj(source, plain_log)
+        yield plain_log_path
+
+
+def log_lines(log_file_path):
+    """
+        yields the lines of a log as bytes. The log is memory mapped, so that
+        a large log is never read into memory as a whole. A compressed log is
+        decompressed line by line, as it is read.
+    """
+    if is_compressed(log_file_path):
+        with open_log(log_file_path) as f:
+            yield from f
+        return
+    with open(log_file_path, 'rb') as f:
+        try:
+            log = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # an empty log can not be mapped
+            return
+        with log:
+            yield from iter(log.readline, b'')
+
+
+@contextmanager
+def log_contents(log_file_path):
+    """
+        yields the contents of a log as bytes, for the patterns which are
+        matched over the whole log. The log is memory mapped, while a
+        compressed log is decompressed into memory.
+    """
+    if is_compressed(log_file_path):
+        with open_log(log_file_path) as f:
+            yield f.read()
+        return
+    with open(log_file_path, 'rb') as f:
+        try:
+            log = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # an empty log can not be mapped
+            log = None
+        if log is None:
+            yield b''
+            return
+        with log:
+            yield log
+
+
+def decoded(match):
+    """
+        returns the result of findall for a line, decoded to strings.
+    """
+    if isinstance(match, tuple):
+        return tuple(group.decode(errors='replace') for group in match)
+    return match.decode(errors='replace')
+
+
+def add_matches(matches, name, found, is_counter):
+    """
+        adds the result of findall for a pattern or a counter to matches.
+    """
+    if is_counter:
+        matches[name] += len(found)
+    elif found:
+        matches[name].extend(decoded(match) for match in found)
+
+
+def scan_log(log_file_path, patterns=None, counters=None):
+    """
+        scans a log once, line by line, for all the patterns and counters.
+        Returns a dictionary with the matches of every pattern, as returned by
+        re.findall, and the number of matches of every counter, keyed by their
+        names. Only the counts of the counters are kept.
+
+        The patterns are matched within a line of the log, except those which
+        may match across lines, as found by spans_lines, which are matched
+        over the whole log. The patterns of the BPU formats of regex_formats
+        are not run on every line. A line is first classified by
+        classify_bpu_line, and only the patterns of its format are run on it.
+        When all the line patterns are BPU patterns, the lines without the
+        bpu_prefilter are skipped before any pattern is run.
+    """
+    patterns = compile_patterns(patterns or {})
+    counters = compile_patterns(counters or {})
+
+    matches = {name: [] for name in patterns}
+    matches.update({name: 0 for name in counters})
+
+    # (name, pattern, is_counter) of the BPU patterns, keyed by their format,
+    # of the other line patterns and of the patterns matched over the log
+    bpu_tasks = {}
+    other_tasks = []
+    log_tasks = []
+    for tasks, is_counter in ((patterns, False), (counters, True)):
+        for name, pattern in tasks.items():
+            task = (name, pattern, is_counter)
+            # the BPU formats are logged on a single line
+            if pattern.pattern in bpu_format_names and not pattern.flags:
+                bpu_tasks.setdefault(bpu_format_names[pattern.pattern],
+                                     []).append(task)
+            elif spans_lines(pattern):
+                log_tasks.append(task)
+            else:
+                other_tasks.append(task)
+    prefilter = None if other_tasks else bpu_prefilter.encode()
+
+    if bpu_tasks or other_tasks:
+        for line in log_lines(log_file_path):
+            if prefilter is not None and prefilter not in line:
+                continue
+            line_tasks = other_tasks
+            if bpu_tasks:
+                line_format = classify_bpu_line(line)
+                if line_format in bpu_tasks:
+                    line_tasks = other_tasks + bpu_tasks[line_format]
+            for name, pattern, is_counter in line_tasks:
+                add_matches(matches, name, pattern.findall(line), is_counter)
+
+    if log_tasks:
+        with log_contents(log_file_path) as log:
+            for name, pattern, is_counter in log_tasks:
+                add_matches(matches, name, pattern.findall(log), is_counter)
+
+    return matches
+
+
+def check_test_log(plugin_object, log_file_path, reports_dir):
+    """
+        calls the check_log method of a plugin. When the plugin registers the
+        patterns it looks for in the log, using the log_patterns and
+        log_counters methods, the log is scanned once by scan_log and the
+        matches are passed to check_log along with the path of the log.
+
+        A compressed log is scanned as it is decompressed. The plugins which
+        read the log themselves are passed a path from which the log is read
+        decompressed, as described in readable_log.
+    """
+    log_patterns = getattr(plugin_object, 'log_patterns', None)
+    log_counters = getattr(plugin_object, 'log_counters', None)
+    if log_patterns is None and log_counters is None:
+        with readable_log(log_file_path) as plain_log_path:
+            return plugin_object.check_log(plain_log_path, reports_dir)
+
+    matches = scan_log(log_file_path,
+                       patterns=log_patterns() if log_patterns else None,
+                       counters=log_counters() if log_counters else None)
+    with readable_log(log_file_path) as plain_log_path:
+        return plugin_object.check_log(plain_log_path, reports_dir,
+                                       matches=matches)
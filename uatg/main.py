@@ -8,6 +8,7 @@ import click
 
 from uatg.__init__ import __version__
 from uatg.log import logger
+from uatg.test_compiler import compile_tests
 from uatg.test_generator import generate_sv
 from uatg.test_generator import generate_tests, clean_dirs, validate_tests
 from uatg.utils import combine_config_yamls, create_alias_file, run_make
@@ -155,11 +156,60 @@ def clean(module_dir, work_dir, verbose):
               default=None,
               help='Select the paging modes for whihc the tests need to be '
                     'generated')
+@click.option('--fan_out',
+              '-fo',
+              is_flag=True,
+              required=False,
+              help='Set this flag to render the tests yielded by a plugin '
+              'across all the jobs, instead of the job running the plugin')
+@click.option('--no_cache',
+              '-nc',
+              is_flag=True,
+              required=False,
+              help='Set this flag to regenerate the tests of all the plugins, '
+              'even if they are unchanged since the previous run')
+@click.option('--seed',
+              '-s',
+              default=None,
+              required=False,
+              help='Seed for the random values used by the plugins',
+              type=click.INT)
+@click.option('--profile',
+              '-p',
+              is_flag=True,
+              required=False,
+              help='Set this flag to profile the plugins using cProfile. The '
+              'profiles are stored in the profile directory of the work_dir')
+@click.option('--static_pages',
+              '-sp',
+              is_flag=True,
+              required=False,
+              help='Set this flag to initialise the page tables of the '
+              'privileged tests statically, instead of at runtime')
+@click.option('--shared_pages',
+              '-shp',
+              is_flag=True,
+              required=False,
+              help='Set this flag to link the page tables of the privileged '
+              'tests from objects shared by the tests with the same layout')
+@click.option('--ninja',
+              '-nj',
+              is_flag=True,
+              required=False,
+              help='Set this flag to create a build.ninja file, which builds '
+              'the ELF of every test, along with the makefile')
+@click.option('--stream_list',
+              '-sl',
+              is_flag=True,
+              required=False,
+              help='Set this flag to write the entries of the test_list to '
+              'the file one at a time, instead of holding the whole list')
 
 @cli.command()
 def generate(alias_file, configuration, linker_dir, module_dir, gen_cvg,
              gen_test_list, work_dir, modules, verbose, index_file, jobs, 
-             paging_modes):
+             paging_modes, fan_out, no_cache, seed, profile, static_pages,
+             shared_pages, ninja, stream_list):
     """
     Generates tests, cover-groups for a list of modules corresponding to the DUT
     parameters specified in the configuration yamls, inside the work_dir.
@@ -192,7 +242,15 @@ def generate(alias_file, configuration, linker_dir, module_dir, gen_cvg,
                    test_list=str(gen_test_list),
                    index_path=index_file,
                    paging_modes=paging_modes,
-                   jobs=jobs)
+                   jobs=jobs,
+                   fan_out=fan_out,
+                   use_cache=not no_cache,
+                   seed=seed,
+                   profile=profile,
+                   static_pages=static_pages,
+                   shared_pages=shared_pages,
+                   ninja=ninja,
+                   stream_test_list=stream_list)
     if gen_cvg:
         if alias_file is not None:
             alias_dict = load_yaml(alias_file)
@@ -201,7 +259,9 @@ def generate(alias_file, configuration, linker_dir, module_dir, gen_cvg,
                         modules_dir=module_dir,
                         modules=module,
                         alias_dict=alias_dict,
-                        jobs=jobs)
+                        jobs=jobs,
+                        index_path=index_file,
+                        profile=profile)
         else:
             logger.error('Can not generate covergroups without alias_file.')
             exit('GEN_CVG WITHOUT ALIAS_FILE')
@@ -295,6 +355,28 @@ def from_config(config_file, verbose):
     except ValueError:
         jobs = 1
 
+    fan_out = config['uatg'].get('fan_out', 'False').lower() == 'true'
+    use_cache = config['uatg'].get('cache', 'True').lower() == 'true'
+    profile = config['uatg'].get('profile', 'False').lower() == 'true'
+    static_pages = config['uatg'].get('static_pages',
+                                      'False').lower() == 'true'
+    shared_pages = config['uatg'].get('shared_pages',
+                                      'False').lower() == 'true'
+    ninja = config['uatg'].get('ninja', 'False').lower() == 'true'
+    stream_test_list = config['uatg'].get('stream_test_list',
+                                          'False').lower() == 'true'
+    compile_runner = config['uatg'].get('compile_runner', 'make').lower()
+
+    try:
+        seed = int(config['uatg'].get('seed', ''))
+    except ValueError:
+        seed = None
+
+    try:
+        max_failures = int(config['uatg'].get('max_failures', ''))
+    except ValueError:
+        max_failures = None
+
     dut_dict = None
     if config['uatg']['gen_test'].lower() == 'true' or \
             config['uatg']['gen_cvg'].lower() == 'true' or \
@@ -311,13 +393,27 @@ def from_config(config_file, verbose):
                        test_list=config_test_list_flag,
                        index_path=index_yaml_path,
                        paging_modes=required_paging_modes,
-                       jobs=jobs)
+                       jobs=jobs,
+                       fan_out=fan_out,
+                       use_cache=use_cache,
+                       seed=seed,
+                       profile=profile,
+                       static_pages=static_pages,
+                       shared_pages=shared_pages,
+                       ninja=ninja,
+                       stream_test_list=stream_test_list)
 
     if config['uatg']['test_compile'].lower() == 'true':
         logger.info(f'Empty Compilation is enabled')
         logger.info(f'UATG will use RISCV-GCC to check if the generated '
                     f'assembly tests are syntatically correct')
-        run_make(work_dir=config_work_dir, jobs=jobs)
+        if compile_runner == 'uatg':
+            compile_tests(work_dir=config_work_dir,
+                          jobs=jobs,
+                          max_failures=max_failures,
+                          use_cache=use_cache)
+        else:
+            run_make(work_dir=config_work_dir, jobs=jobs)
 
     if config['uatg']['gen_cvg'].lower() == 'true':
         alias_dict = load_yaml(config['uatg']['alias_file'])
@@ -326,13 +422,18 @@ def from_config(config_file, verbose):
                     modules_dir=module_dir,
                     config_dict=dut_dict,
                     alias_dict=alias_dict,
-                    jobs=jobs)
+                    jobs=jobs,
+                    index_path=index_yaml_path,
+                    profile=profile)
 
     if config['uatg']['val_test'].lower() == 'true':
         validate_tests(modules=module,
                        work_dir=config_work_dir,
                        config_dict=dut_dict,
-                       modules_dir=module_dir)
+                       modules_dir=module_dir,
+                       index_path=index_yaml_path,
+                       jobs=jobs,
+                       use_cache=use_cache)
 
     if config['uatg']['clean'].lower() == 'true':
         logger.debug('Invoking clean_dirs')
@@ -508,8 +609,24 @@ def setup(config_path, jobs, modules, module_dir, work_dir, linker_dir,
               help='Set verbose level for debugging',
               type=click.Choice(['info', 'error', 'debug'],
                                 case_sensitive=False))
+@click.option('--jobs',
+              '-j',
+              default=1,
+              help='Number of Jobs for UATG to spawn',
+              type=click.INT)
+@click.option('--no_cache',
+              '-nc',
+              is_flag=True,
+              required=False,
+              help='Set this flag to check all the logs, even if they are '
+              'unchanged since the previous validation')
+@click.option('--index_file',
+              '-i',
+              type=click.Path(exists=True, resolve_path=True, readable=True),
+              help="Path to index.yaml file from the tests directory")
 @cli.command()
-def validate(configuration, module_dir, work_dir, modules, verbose):
+def validate(configuration, module_dir, work_dir, modules, verbose, jobs,
+             no_cache, index_file):
     """
         Parses the log generated upon test execution using regular expressions
         and provides a minimal coverage report.\n
@@ -519,6 +636,9 @@ def validate(configuration, module_dir, work_dir, modules, verbose):
                   -md, --module_dir\n
         Optional: -m, --modules (default - all)\n
                   -v, --verbose\n
+                  -j, --jobs\n
+                  -nc, --no_cache\n
+                  -i, --index_file\n
     """
     logger.level(verbose)
     info(__version__)
@@ -533,10 +653,14 @@ def validate(configuration, module_dir, work_dir, modules, verbose):
     }
     dut_dict = combine_config_yamls(temp_cfg)
 
-    module = clean_modules(module_dir, modules)
+    module = clean_modules(module_dir, modules, index_file,
+                           optional_index=True)
     validate_tests(modules=module,
                    work_dir=work_dir,
                    config_dict=dut_dict,
-                   modules_dir=module_dir)
+                   modules_dir=module_dir,
+                   index_path=index_file,
+                   jobs=jobs,
+                   use_cache=not no_cache)
 
     uatg_exit()
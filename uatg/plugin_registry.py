@@ -0,0 +1,176 @@
+# See LICENSE.incore for license details
+"""Registry of the UATG plugins shared by all the phases of a run."""
+
+import sys
+from sys import exit
+from importlib.util import spec_from_file_location, module_from_spec
+from inspect import isclass
+from os import listdir
+from os.path import join, abspath, isfile
+
+from yapsy.IPlugin import IPlugin
+from yapsy.PluginInfo import PluginInfo
+
+from uatg.log import logger
+from uatg.utils import load_yaml
+
+# registries created within this process, keyed by the modules directory and
+# the index file.
+registries = {}
+
+
+class PluginRegistry:
+    """
+        Holds the plugins of the modules present in a modules directory.
+        The plugins of a module are loaded the first time they are requested,
+        and the same plugin objects are returned to every later request.
+        Hence, the generate, coverage and validate phases of a run share the
+        plugins, and a module which is not used by any phase is never imported.
+
+        The plugins are discovered from the index file, which is read once, and
+        are imported directly. Nothing is written to the modules directory.
+        When optional_index is True and the index file does not exist, all the
+        plugins of a module are enabled.
+    """
+
+    def __init__(self, modules_dir, index_path, optional_index=False):
+        self.modules_dir = modules_dir
+        self.index_path = index_path
+        self.optional_index = optional_index
+        self._index = None
+        self._plugins = {}
+
+    @property
+    def index(self):
+        """
+            contents of the index file. None is returned when the index file
+            is optional and does not exist.
+        """
+        if self._index is None:
+            if self.optional_index and not isfile(self.index_path):
+                logger.warning(f'{self.index_path} not found. All the '
+                               f'plugins of the modules are enabled')
+                # marks the index file as missing
+                self._index = False
+            else:
+                logger.debug(f'using the index file {self.index_path}')
+                self._index = load_yaml(self.index_path)
+        return None if self._index is False else self._index
+
+    def plugins(self, module):
+        """
+            returns the list of the plugins of the module.
+        """
+        if module not in self._plugins:
+            self._plugins[module] = self._load(module)
+        return self._plugins[module]
+
+    def plugin(self, module, name):
+        """
+            returns the plugin of the module with the name specified.
+        """
+        for plugin in self.plugins(module):
+            if plugin.name == name:
+                return plugin
+        raise KeyError(f'{name} is not a plugin of {module}')
+
+    def _load(self, module):
+        """
+            imports the plugins of the module which are enabled in the index
+            file, and returns their PluginInfo objects.
+        """
+        module_dir = join(self.modules_dir, module)
+
+        logger.debug(f'Directory for {module} is {module_dir}')
+        logger.info(f'Starting plugin discovery for {module}')
+
+        # the module directory is added to the python path, so that the plugins
+        # can import the other python files of the module.
+        if module_dir not in sys.path:
+            sys.path.insert(0, module_dir)
+
+        plugins = []
+        error_status = []
+        for file in sorted(listdir(module_dir)):
+            if not (file.endswith('.py') and file.startswith('uatg_')):
+                continue
+            test_name = file[0:-3]
+
+            if self.index is None:
+                val = True
+            else:
+                try:
+                    val = self.index[module][test_name]
+                except (KeyError, TypeError):
+                    logger.critical(
+                        f'There is no entry for test - {test_name}')
+                    exit(f'update the index.yaml with your new test')
+
+            if not val:
+                logger.warn(
+                    f'Skippping test {test_name} as index yaml has False')
+                continue
+
+            plugin_info = PluginInfo(test_name, join(module_dir, test_name))
+            try:
+                plugin_info.plugin_object = self._instantiate(
+                    module, test_name, join(module_dir, file))
+            except Exception as e:
+                error_status.append((join(module_dir, file), e))
+                continue
+            plugins.append(plugin_info)
+            logger.debug(f'Loaded plugin for {test_name}')
+
+        if len(error_status) > 0:
+            for i in error_status:
+                logger.error(str(i[0]) + ' : ' + str(i[1]))
+            exit('Python Errors at one/multiple files')
+
+        logger.info(f'Loaded plugins for {module}')
+
+        return plugins
+
+    @staticmethod
+    def _instantiate(module, test_name, path):
+        """
+            imports the python file of the plugin and returns an instance of the
+            IPlugin subclass defined in it.
+        """
+        module_name = f'uatg_loaded_{module}_{test_name}'
+        spec = spec_from_file_location(module_name, path)
+        plugin_module = module_from_spec(spec)
+        # registering the module allows the plugin objects to be pickled
+        sys.modules[module_name] = plugin_module
+        try:
+            spec.loader.exec_module(plugin_module)
+        except Exception:
+            del sys.modules[module_name]
+            raise
+
+        for name in dir(plugin_module):
+            element = getattr(plugin_module, name)
+            if isclass(element) and issubclass(element, IPlugin) and \
+                    element is not IPlugin:
+                return element()
+        raise ImportError(f'No IPlugin subclass found in {path}')
+
+
+def plugin_registry(modules_dir, index_path=None, optional_index=False):
+    """
+        returns the PluginRegistry of the modules directory. The registry is
+        created once per process, and is shared by every later invocation with
+        the same modules directory and index file. optional_index enables all
+        the plugins when the index file does not exist, as used by the
+        validation.
+    """
+    modules_dir = abspath(modules_dir)
+    if not (index_path and isfile(abspath(index_path)) and
+            index_path.endswith(('.yaml', '.yml'))):
+        # the index yaml is in the modules directory
+        index_path = join(modules_dir, 'index.yaml')
+    index_path = abspath(index_path)
+
+    if (modules_dir, index_path) not in registries:
+        registries[(modules_dir, index_path)] = PluginRegistry(
+            modules_dir, index_path, optional_index)
+    return registries[(modules_dir, index_path)]
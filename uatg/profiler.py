@@ -0,0 +1,152 @@
+# See LICENSE.incore for license details
+"""Profiling of the tasks run by the UATG process pools."""
+
+from cProfile import Profile
+from glob import glob
+from multiprocessing.util import Finalize
+from os import getpid, makedirs
+from os.path import join, basename
+from pstats import Stats
+from shutil import rmtree
+
+from uatg.log import logger
+
+# profiler of the current process, created by init_profiled_worker.
+process_profiler = {}
+
+
+def init_profiled_worker(profile_dir, initializer=None, initargs=()):
+    """
+        initializer for the processes of a profiled pool. Runs the initializer
+        of the pool, and creates the profiler of the process. The stats of all
+        the tasks run by the process are dumped to a per process .prof file
+        within the profile directory once, when the process exits, by
+        dump_profile.
+    """
+    if initializer is not None:
+        initializer(*initargs)
+    process_profiler['profiler'] = Profile()
+    process_profiler['tasks'] = 0
+    Finalize(None,
+             dump_profile,
+             args=(join(profile_dir, f'worker-{getpid()}.prof'),),
+             exitpriority=10)
+
+
+def dump_profile(path):
+    """
+        dumps the stats of the profiler of the process to path, unless the
+        process ran no task.
+    """
+    if process_profiler['tasks']:
+        process_profiler['profiler'].dump_stats(path)
+
+
+def profile_task(args):
+    """
+        runs a task of a process pool under the profiler of the process.
+    """
+    func, task_args = args
+
+    profiler = process_profiler['profiler']
+    process_profiler['tasks'] += 1
+    profiler.enable()
+    try:
+        return func(task_args)
+    finally:
+        profiler.disable()
+
+
+def profiled(func, arg_list, profile_dir):
+    """
+        returns the function and the list of arguments to be submitted to a
+        process pool instead of func and arg_list, so that every task is run
+        under the profiler. arg_list is consumed lazily, as the pool takes the
+        tasks. The pool is to be created with the initializer
+        returned by profiled_initializer. Nothing is changed when profile_dir
+        is None.
+    """
+    if profile_dir is None:
+        return func, arg_list
+    return profile_task, ((func, args) for args in arg_list)
+
+
+def profiled_initializer(initializer, initargs, profile_dir):
+    """
+        returns the initializer and its arguments to be passed to a process
+        pool whose tasks are submitted using profiled. Nothing is changed when
+        profile_dir is None.
+    """
+    if profile_dir is None:
+        return initializer, initargs
+    return init_profiled_worker, (profile_dir, initializer, initargs)
+
+
+def create_profile_dir(profile_dir):
+    """
+        creates an empty directory for the per process .prof files.
+    """
+    rmtree(profile_dir, ignore_errors=True)
+    makedirs(profile_dir)
+    logger.debug(f'Profiling the tasks into {profile_dir}')
+
+
+def merge_profiles(profile_dir, output):
+    """
+        merges the per process .prof files of the profile directory into
+        output.prof, which can be read using pstats, and into output.collapsed,
+        which holds the collapsed stacks used to draw flamegraphs.
+    """
+    prof_files = sorted(glob(join(profile_dir, 'worker-*.prof')))
+    if not prof_files:
+        logger.warning(f'No profiles were found in {profile_dir}')
+        return
+
+    stats = Stats(*prof_files)
+    stats.dump_stats(output + '.prof')
+
+    with open(output + '.collapsed', 'w') as f:
+        f.writelines(f'{";".join(stack)} {value}\n'
+                     for stack, value in collapsed_stacks(stats))
+
+    logger.info(f'Merged the profiles of {len(prof_files)} process(es) into '
+                f'{output}.prof and {output}.collapsed')
+
+
+def collapsed_stacks(stats, min_time=1e-6):
+    """
+        yields the call stacks in the stats along with the time (in
+        microseconds) spent within the last function of the stack.
+        cProfile records only the caller-callee pairs. Hence, the time of a
+        function is split between its callers in proportion to the time spent
+        by the function when called by each of them.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def label(func):
+        file, line, name = func
+        if file == '~':
+            return name.replace(' ', '_').replace(';', ':')
+        return f'{name}:{basename(file)}:{line}'.replace(' ', '_')
+
+    def walk(func, stack, cum_time):
+        _, _, tot_time, func_cum_time, _ = stats.stats[func]
+        stack = stack + [label(func)]
+        # fraction of the calls to func which are made through this stack
+        fraction = cum_time / func_cum_time if func_cum_time else 0
+        self_time = tot_time * fraction
+        if self_time >= min_time:
+            yield stack, round(self_time * 1e6)
+        for callee, edge_cum_time in callees.get(func, []):
+            if label(callee) in stack:
+                # recursive calls are attributed to the outermost call
+                continue
+            if edge_cum_time * fraction >= min_time:
+                yield from walk(callee, stack, edge_cum_time * fraction)
+
+    for func, (_, _, _, cum_time, callers) in stats.stats.items():
+        if not callers:
+            yield from walk(func, [], cum_time)
@@ -1,66 +1,151 @@
 # See LICENSE.incore for license details
 
+from re import compile
+
+# Every line logged by the BPU starts with the bpu_prefix, which is followed
+# by one of the formats below. The *_pattern strings are the patterns of the
+# formats, and the *_re objects are the same patterns compiled once, when the
+# module is imported.
+bpu_prefix = r"\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\s"
+
+# substring present in every line logged by the BPU. The other lines of a log
+# can be skipped using it, before any pattern is matched.
+bpu_prefilter = 'BPU :'
+
 # [      8000] [ 0]BPU : Match:00000000
-bpu_match_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sMatch\:\d{8}"
+bpu_match_format = r"Match\:\d{8}"
 
 # [ 5570] [ 0]BPU : BTB Hit: BTBEntry { target: 'h00000000800003ac,
 #                                        ci: Branch, instr16: False, hi: False }
-btb_hit_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sBTB\sHit\:\sBTBEntry" \
-                       + "\s\{\starget\:\s'h[0-9a-z]+\,\sci:\s\w*\,\sinstr16:\s\w*\,\shi\:\s\w*\s\}"
+btb_hit_format = r"BTB\sHit\:\sBTBEntry" \
+                 r"\s\{\starget\:\s'h[0-9a-z]+\,\sci:\s\w*\,\sinstr16:\s\w*" \
+                 r"\,\shi\:\s\w*\s\}"
 
 # [120] [ 0]BPU : Received Request: PredictionRequest { pc: 'h0000000000001000,
 #                                   fence: False, discard: False } ghr: 00000000
-pred_req_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sReceived\sRequest\:" \
-                        + "\sPredictionRequest\s\{\spc\:\s'h[0-9a-z]+\,\sfence\:\s\w+\,\sdiscard\:\s" \
-                        + "\w+\s\}\sghr\:\s\d+"
+pred_req_format = r"Received\sRequest\:" \
+                  r"\sPredictionRequest\s\{\spc\:\s'h[0-9a-z]+\,\sfence\:\s" \
+                  r"\w+\,\sdiscard\:\s\w+\s\}\sghr\:\s\d+"
 
 # [ 1240] [ 0]BPU : Received Training: Training_data { pc: 'h0000000000001010,
 # target: 'h0000000080000000, state: 'h3, ci: JAL, btbhit: False, instr16: False
 #                                                              , history: 'h00 }
-train_data_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sReceived\s" \
-                          + "Training\:\sTraining_data\s\{\spc\:\s'h[0-9a-z]+\,\starget\:\s'h[0-9a-z]+" \
-                          + "\,\sstate:\s'h\d{1}\,\sci\:\s\w+\,\sbtbhit\:\s\w+\,\sinstr16\:\s\w+\," \
-                          + "\shistory\:\s'h\d{2}\s\}"
+train_data_format = r"Received\sTraining\:\sTraining_data\s\{\spc\:\s" \
+                    r"'h[0-9a-z]+\,\starget\:\s'h[0-9a-z]+\,\sstate:\s'h\d{1}" \
+                    r"\,\sci\:\s\w+\,\sbtbhit\:\s\w+\,\sinstr16\:\s\w+\," \
+                    r"\shistory\:\s'h\d{2}\s\}"
 
 # [ 5580] [ 0]BPU : Training existing Entry index:  2 ghr: 00000000
-train_existing_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sTraining\sexisting\sEntry\sindex\:\s+\d+\s+ghr\:\s\d+"
+train_existing_format = r"Training\sexisting\sEntry\sindex\:\s+\d+\s+ghr\:" \
+                        r"\s\d+"
 
 # [ 5430] [ 0]BPU : Allocating new index:  1 ghr: 00000000
-alloc_newind_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sAllocating\snew\s" \
-                            + "index\:\s+[0-9]+\sghr\:\s\d+"
+alloc_newind_format = r"Allocating\snew\sindex\:\s+[0-9]+\sghr\:\s\d+"
 
 # [      7880] [ 0]BPU : Conflict Detected
-conflict_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sConflict\sDetected"
+conflict_format = r"Conflict\sDetected"
 
 # [      6320] [ 0]BPU : Pushing into RAS:00000000800003c8
-pushing_to_ras_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sPushing\s" \
-                              + "into\sRAS\:[0-9a-z]+"
+pushing_to_ras_format = r"Pushing\sinto\sRAS\:[0-9a-z]+"
 
 # [      6540] [ 0]BPU : Choosing from top RAS:0000000080000404
-choosing_top_ras_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sChoosing\s" \
-                                + "from\stop\sRAS\:[0-9a-z]+"
+choosing_top_ras_format = r"Choosing\sfrom\stop\sRAS\:[0-9a-z]+"
 
 # [      6000] [ 0]BPU : New GHR: 01111100
-new_ghr_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sNew\sGHR\:\s\d+"
+new_ghr_format = r"New\sGHR\:\s\d+"
 
 # [      5920] [ 0]BPU : BHTindex_:233 Target:0000000080000396 Pred:3
 #                                                                  ghr: 11110000
-bht_ind_target_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\s" \
-                              + "BHTindex_\:\d+\sTarget\:\s*\d+\sPred\:\d+\sghr\:\s\d+"
+bht_ind_target_format = r"BHTindex_\:\d+\sTarget\:\s*\d+\sPred\:\d+\sghr\:" \
+                        r"\s\d+"
 
 # [      7950] [ 0]BPU : Misprediction fired. Restoring ghr: 01111111
-misprediction_pattern = "\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\s" \
-                             + "Misprediction\sfired\.\sRestoring\sghr\:\s\d+"
+misprediction_format = r"Misprediction\sfired\.\sRestoring\sghr\:\s\d+"
+
+# formats of the lines logged by the BPU, keyed by the names of their patterns
+bpu_formats = {
+    'bpu_match': bpu_match_format,
+    'btb_hit': btb_hit_format,
+    'pred_req': pred_req_format,
+    'train_data': train_data_format,
+    'train_existing': train_existing_format,
+    'alloc_newind': alloc_newind_format,
+    'conflict': conflict_format,
+    'pushing_to_ras': pushing_to_ras_format,
+    'choosing_top_ras': choosing_top_ras_format,
+    'new_ghr': new_ghr_format,
+    'bht_ind_target': bht_ind_target_format,
+    'misprediction': misprediction_format
+}
+
+bpu_match_pattern = bpu_prefix + bpu_match_format
+btb_hit_pattern = bpu_prefix + btb_hit_format
+pred_req_pattern = bpu_prefix + pred_req_format
+train_data_pattern = bpu_prefix + train_data_format
+train_existing_pattern = bpu_prefix + train_existing_format
+alloc_newind_pattern = bpu_prefix + alloc_newind_format
+conflict_pattern = bpu_prefix + conflict_format
+pushing_to_ras_pattern = bpu_prefix + pushing_to_ras_format
+choosing_top_ras_pattern = bpu_prefix + choosing_top_ras_format
+new_ghr_pattern = bpu_prefix + new_ghr_format
+bht_ind_target_pattern = bpu_prefix + bht_ind_target_format
+misprediction_pattern = bpu_prefix + misprediction_format
+
+# the patterns above, compiled once when the module is imported
+bpu_match_re = compile(bpu_match_pattern)
+btb_hit_re = compile(btb_hit_pattern)
+pred_req_re = compile(pred_req_pattern)
+train_data_re = compile(train_data_pattern)
+train_existing_re = compile(train_existing_pattern)
+alloc_newind_re = compile(alloc_newind_pattern)
+conflict_re = compile(conflict_pattern)
+pushing_to_ras_re = compile(pushing_to_ras_pattern)
+choosing_top_ras_re = compile(choosing_top_ras_pattern)
+new_ghr_re = compile(new_ghr_pattern)
+bht_ind_target_re = compile(bht_ind_target_pattern)
+misprediction_re = compile(misprediction_pattern)
+
+# matches a line logged by the BPU against all the formats at once. The name
+# of the group matched is the name of the format of the line.
+bpu_line_pattern = bpu_prefix + '(?:' + '|'.join(
+    f'(?P<{name}>{line_format})'
+    for name, line_format in bpu_formats.items()) + ')'
+bpu_line_re = compile(bpu_line_pattern)
+# bpu_line_re and bpu_prefilter, to classify the lines read as bytes
+bpu_line_bytes_re = compile(bpu_line_pattern.encode())
+bpu_prefilter_bytes = bpu_prefilter.encode()
+
+
+def classify_bpu_line(line):
+    """
+        returns the name of the format of a line of the log, as in
+        bpu_formats, using a single match. The line can be a string or bytes.
+        None is returned when the line is not logged by the BPU, or is of none
+        of the formats.
+    """
+    if isinstance(line, bytes):
+        prefilter, line_re = bpu_prefilter_bytes, bpu_line_bytes_re
+    else:
+        prefilter, line_re = bpu_prefilter, bpu_line_re
+    if prefilter not in line:
+        return None
+    match = line_re.search(line)
+    if match is None:
+        return None
+    return match.lastgroup
+
 
 # fence executed result for log level 5
 """
-[     10980] [ 0]BPU : Fenced, Valid Bits -> 0 
-[     10980] [ 0]BPU : Match:00000000 
-[     10980] [ 0]BPU : rg_allocate -> 00 
-[     10980] [ 0]BPU : current_ghr -> 00000000 
+[     10980] [ 0]BPU : Fenced, Valid Bits -> 0
+[     10980] [ 0]BPU : Match:00000000
+[     10980] [ 0]BPU : rg_allocate -> 00
+[     10980] [ 0]BPU : current_ghr -> 00000000
 """
-fence_executed_pattern = "(\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sFenced\," \
-                         "\sValid\sBits\s\-\>\s0)(.*\n){2}(\[\s*[0-9]*\]\s\[" \
-                         "\s*[0-9]*\]BPU\s\:\srg\_allocate\s\-\>\s[0-9]*\n)(" \
-                         "\[\s*[0-9]*\]\s\[\s*[" \
-                         "0-9]*\]BPU\s\:\scurrent_ghr\s\-\>\s0+)"
+# the pattern spans multiple lines of the log
+fence_executed_pattern = r"(\[\s*[0-9]*\]\s\[\s*[0-9]*\]BPU\s\:\sFenced\," \
+                         r"\sValid\sBits\s\-\>\s0)(.*\n){2}(\[\s*[0-9]*\]\s\[" \
+                         r"\s*[0-9]*\]BPU\s\:\srg\_allocate\s\-\>\s[0-9]*\n)(" \
+                         r"\[\s*[0-9]*\]\s\[\s*[" \
+                         r"0-9]*\]BPU\s\:\scurrent_ghr\s\-\>\s0+)"
+fence_executed_re = compile(fence_executed_pattern)
@@ -0,0 +1,243 @@
+# See LICENSE.incore for license details
+"""Compile runner of the syntax check of the generated tests."""
+
+from glob import glob
+from hashlib import sha256
+from multiprocessing.pool import ThreadPool
+from os.path import join, isfile, splitext
+from shlex import split
+from shutil import which
+from subprocess import run, PIPE
+from sys import exit
+from time import perf_counter
+
+from uatg.log import logger
+from uatg.utils import load_json_cache, dump_json_cache, file_hash
+
+
+def compile_command(flags, test):
+    """
+        returns the command which compiles a test of the compile list, using
+        the same flags as the makefile.
+    """
+    return [flags['cc']] + split(flags['cflags']) + \
+        ['-T', flags['linker'], test['source']] + test['extra_compile'] + \
+        split(flags['includes']) + \
+        ['-D' + macro for macro in test['compile_macros']] + \
+        ['-o', '/dev/null']
+
+
+def assemble_command(flags, object_path):
+    """
+        returns the command which assembles a page table object shared by the
+        tests.
+    """
+    return [flags['cc']] + split(flags['asflags']) + \
+        ['-c', splitext(object_path)[0] + '.S', '-o', object_path]
+
+
+def env_hash(flags):
+    """
+        returns the digest of the linker script and of the headers within the
+        include directories of the tests, which are common to every test.
+    """
+    include_dirs = split(flags['includes'])[1::2]
+    headers = sorted(
+        path for include_dir in include_dirs
+        for path in glob(join(include_dir, '*.h')))
+    return file_hash(
+        [path for path in [flags['linker']] + headers if isfile(path)])
+
+
+def compile_key(cmd, test, env_digest):
+    """
+        returns the key of the compile result of a test, which is a digest of
+        the compile command, of the contents of the test and of its extra
+        inputs, and of the env_digest. None is returned when an input of the
+        test is missing.
+    """
+    # the page table objects are built from their sources
+    inputs = [test['source']] + [
+        splitext(path)[0] + '.S' if path.endswith('.o') else path
+        for path in test['extra_compile']
+    ]
+    try:
+        inputs_digest = file_hash(inputs)
+    except OSError:
+        return None
+    return sha256((env_digest + '\0'.join(cmd) +
+                   inputs_digest).encode()).hexdigest()
+
+
+def run_command(args):
+    """
+        runs the command of a task of the compile runner. Returns the name of
+        the task, whether the command succeeded, the time it took and the
+        stderr of the command, which is kept only when the command failed.
+        A command which can not be run fails with the error as its stderr.
+    """
+    name, cmd = args
+    start = perf_counter()
+    try:
+        out = run(cmd, stdout=PIPE, stderr=PIPE)
+    except OSError as e:
+        # the compiler could not be run
+        return name, False, perf_counter() - start, str(e)
+    elapsed = perf_counter() - start
+    if out.returncode == 0:
+        return name, True, elapsed, ''
+    return name, False, elapsed, out.stderr.decode(errors='replace')
+
+
+def compile_tests(work_dir, jobs, max_failures=None, use_cache=True):
+    """
+        compiles the tests in the compile list of the work directory, which is
+        written by generate_tests, using a pool of jobs compiler processes.
+        The page table objects shared by the tests are assembled first.
+
+        The result of every test is logged as soon as the test is compiled,
+        and the results are written to compile_report.json in the work
+        directory. The page table objects which fail to assemble are reported
+        apart from the tests. When the compiler is not found, every test fails
+        without being run. Only the stderr of the failing tests is kept. When
+        max_failures is set, the remaining tests are not compiled once as many
+        tests have failed.
+
+        Unless use_cache is False, the tests which compiled successfully in a
+        previous run on the work directory are not compiled again, when
+        neither their contents, their compile command, the linker script nor
+        the headers they include have changed since.
+
+        :param work_dir: path to the work directory
+        :param jobs: number of compiler processes to run in parallel
+        :param max_failures: number of failures after which the runner stops
+        :param use_cache: reuse the results of the previous runs
+        :returns: number of tests which failed to compile
+        :rtype: int
+    """
+    compile_list_path = join(work_dir, 'compile_list.json')
+    if not isfile(compile_list_path):
+        logger.error(f'compile_list.json not found in {work_dir}. Please '
+                     f'generate the tests before compiling them')
+        exit('FILE_NOT_FOUND')
+    compile_list = load_json_cache(compile_list_path)
+    flags = compile_list['flags']
+
+    results = {
+        test['name']: {
+            'module': test['module'],
+            'source': test['source'],
+            'result': 'not run',
+            'time': 0.0,
+            'cached': False,
+            'stderr': ''
+        } for test in compile_list['tests']
+    }
+
+    # keys of the tests which compiled successfully in the previous runs
+    cache_path = join(work_dir, '.uatg_cache', 'compile.json')
+    compile_cache = load_json_cache(cache_path) if use_cache else {}
+    env_digest = env_hash(flags)
+
+    keys = {}
+    test_tasks = []
+    page_tables = set()
+    for test in compile_list['tests']:
+        cmd = compile_command(flags, test)
+        keys[test['name']] = compile_key(cmd, test, env_digest)
+        if keys[test['name']] is not None and \
+                compile_cache.get(test['name']) == keys[test['name']]:
+            results[test['name']].update(result='pass', cached=True)
+            continue
+        test_tasks.append((test['name'], cmd))
+        page_tables.update(path for path in test['extra_compile']
+                           if path.endswith('.o'))
+
+    logger.info(f'Compiling {len(test_tasks)} tests using {jobs} job(s). '
+                f'{len(results) - len(test_tasks)} tests are unchanged since '
+                f'the previous run')
+
+    # results of the page table objects, which are not a part of the count
+    page_table_results = {}
+    tasks = [[(path, assemble_command(flags, path))
+              for path in compile_list['page_tables']
+              if path in page_tables], test_tasks]
+
+    failures = 0
+    page_table_failures = 0
+    done = 0
+    if test_tasks and which(flags['cc']) is None:
+        # none of the tests can be compiled
+        logger.error(f'{flags["cc"]} not found. Please add the RISC-V '
+                     f'toolchain to the PATH')
+        for name, cmd in test_tasks:
+            results[name].update(result='fail',
+                                 stderr=f'{flags["cc"]} not found')
+        failures = len(test_tasks)
+        tasks = []
+    with ThreadPool(max(jobs, 1)) as pool:
+        for task_list in tasks:
+            for name, passed, elapsed, stderr in pool.imap_unordered(
+                    run_command, task_list):
+                if name in results:
+                    done += 1
+                    results[name].update(result='pass' if passed else 'fail',
+                                         time=round(elapsed, 6),
+                                         stderr=stderr)
+                    progress = f'[{done}/{len(test_tasks)}]'
+                else:
+                    page_table_results[name] = {
+                        'result': 'pass' if passed else 'fail',
+                        'stderr': stderr
+                    }
+                    progress = '[page tables]'
+                if passed:
+                    logger.info(f'{progress} PASS | {name}')
+                    continue
+                if name in results:
+                    failures += 1
+                else:
+                    page_table_failures += 1
+                logger.error(f'{progress} FAIL | {name}\n{stderr}')
+                if max_failures and failures >= max_failures:
+                    break
+            if max_failures and failures >= max_failures:
+                logger.warning(f'Stopping the compilation after {failures} '
+                               f'failure(s)')
+                break
+
+    if use_cache:
+        dump_json_cache(
+            cache_path, {
+                name: keys[name]
+                for name, result in results.items()
+                if result['result'] == 'pass' and keys[name] is not None
+            })
+
+    counts = {'pass': 0, 'fail': 0, 'not run': 0}
+    for result in results.values():
+        counts[result['result']] += 1
+    dump_json_cache(join(work_dir, 'compile_report.json'), {
+        'passed': counts['pass'],
+        'failed': counts['fail'],
+        'not_run': counts['not run'],
+        'page_tables_failed': page_table_failures,
+        'page_tables': page_table_results,
+        'tests': results
+    })
+
+    logger.info(f'Compiled {done} test(s). {counts["pass"]} passed (of which '
+                f'{len(results) - len(test_tasks)} unchanged), '
+                f'{counts["fail"]} failed, {counts["not run"]} not run')
+    if page_table_failures:
+        logger.error(f'{page_table_failures} of {len(page_table_results)} '
+                     f'page table object(s) failed to assemble')
+    logger.info(f'The results are in {join(work_dir, "compile_report.json")}')
+    if failures or page_table_failures:
+        logger.warning(f'Please fix the errors and re-generate the tests')
+        logger.info('Empty Syntax Check - Complete! Error found.')
+    else:
+        logger.info('All the generated Assmebly files are syntatically correct')
+        logger.info('Empty Syntax Check - Complete! No errors found.')
+
+    return failures
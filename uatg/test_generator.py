@@ -1,301 +1,476 @@
 # See LICENSE.incore for license details
 
+from collections import namedtuple
 from datetime import datetime
 from getpass import getuser
 from glob import glob
-from multiprocessing import Pool, Manager
-from os import mkdir, makedirs, remove
-from os.path import join, dirname, abspath, exists, isdir, isfile
+from multiprocessing import Pool, Queue
+from os import mkdir, makedirs, remove, listdir, stat
+from os.path import join, dirname, abspath, exists, isdir, isfile, splitext
+from random import seed as random_seed
 from shutil import rmtree, copyfile
 from sys import exit
+from time import perf_counter
 
 from ruamel.yaml import dump
-from yapsy.PluginManager import PluginManager, PluginInfo
 
-from uatg import __file__
+from uatg import __file__, __version__
 from uatg.log import logger
-from uatg.utils import create_plugins, generate_test_list, create_linker, \
-    create_model_test_h, join_yaml_reports, generate_sv_components, \
-    list_of_modules, rvtest_data, dump_makefile, setup_pages, \
-    select_paging_modes, macros_parser
+from uatg.log_scanner import check_test_log, find_log
+from uatg.plugin_registry import plugin_registry
+from uatg.profiler import profiled, profiled_initializer, create_profile_dir, \
+    merge_profiles
+from uatg.test_renderer import TestRenderer
+from uatg.utils import generate_test_list, create_linker, \
+    create_model_test_h, create_page_table_symbols, join_yaml_reports, generate_sv_components, \
+    list_of_modules, rvtest_data, dump_makefile, memoized_setup_pages, \
+    create_shared_page_tables, dump_module_makefile, dump_ninja, \
+    dump_compile_list, \
+    select_paging_modes, compile_macro_index, file_hash, config_hash, \
+    module_hash, \
+    load_json_cache, dump_json_cache, peak_rss, rss_stats, dump_timing_report
+
+# compact record returned by the generation pool for every test written.
+# The records are merged by the parent to create the makefile and test_list.
+TestRecord = namedtuple('TestRecord', [
+    'name', 'module', 'compile_macros', 'self_checking', 'extra_compile'
+], defaults=[()])
+
+# state shared by all the tasks run within a worker of the generation pool.
+# populated once per worker by init_generation_worker.
+worker_state = {}
+
+
+def init_generation_worker(config_dict, isa, page_modes, seed, modules_dir,
+                           index_path, compile_macros, renderers, pages_dir,
+                           static_pages, shared_pages, test_queue=None):
+    """
+        initializer for the processes of the generation pool.
+        The DUT configuration, the run wide parameters, the index of the
+        compile macros and the TestRenderers of the modules are stored within
+        the worker once, instead of being shipped along with every plugin task.
+        pages_dir is the directory in which the page tables are persisted, None
+        if they are not to be persisted.
+        The plugins are looked up by name from the plugin registry of the
+        worker. test_queue is the queue through which the tests yielded by the
+        plugins are streamed back to the parent, when fan_out is set.
+    """
+    worker_state['registry'] = plugin_registry(modules_dir, index_path)
+    worker_state['config_dict'] = config_dict
+    worker_state['isa'] = isa
+    worker_state['page_modes'] = page_modes
+    worker_state['seed'] = seed
+    worker_state['compile_macros'] = compile_macros
+    worker_state['renderers'] = renderers
+    worker_state['pages_dir'] = pages_dir
+    worker_state['static_pages'] = static_pages
+    worker_state['shared_pages'] = shared_pages
+    worker_state['test_queue'] = test_queue
+
+
+def prepare_test(t_name, seq, ret_list_of_dicts):
+    """
+        prepares a test dict yielded by the generate_asm method of a plugin for
+        rendering. The name, compile macros and the page table parameters of
+        the test are resolved here, so that the numbering of the tests remains
+        the same irrespective of the process which renders them.
+        Returns a dict describing the test. None if the test is to be skipped.
+    """
+    isa = worker_state['isa']
+    page_modes = worker_state['page_modes']
 
-# create a manager for shared resources
-process_manager = Manager()
+    test_name = t_name + '-' + seq
 
+    assert isinstance(ret_list_of_dicts, dict)
+    # Checking for the returned sections from each test
+    asm_code = ret_list_of_dicts['asm_code']
 
-def asm_generation_process(args):
-    """
-        for every plugin, a process shall be spawned.
-        The new process shall create an Assembly test file.
-    """
-    # unpacking the args tuple
-    plugin, config_dict, isa, test_format_string, work_tests_dir, \
-    make_file, module, linker_dir, uarch_dir, work_dir, \
-    compile_macros_dict, self_checking_dict, module_test_count_dict, page_modes = args
+    try:
+        if ret_list_of_dicts['name_postfix']:
+            inst_name_postfix = '-' + ret_list_of_dicts['name_postfix']
+        else:
+            inst_name_postfix = ''
+    except KeyError:
+        inst_name_postfix = ''
 
-    # actual generation process
-    check = plugin.plugin_object.execute(config_dict)
+    # add inst name to test name as postfix
+    test_name = test_name + inst_name_postfix
+    logger.debug(f'Selected test: {test_name}')
 
-    name = (str(plugin.plugin_object).split(".", 1))
-    t_name = ((name[1].split(" ", 1))[0])
+    try:
+        asm_data = ret_list_of_dicts['asm_data']
+    except KeyError:
+        asm_data = rvtest_data(bit_width=0, num_vals=1, random=True)
 
-    # data section for paging pages
-    priv_asm_code = ['', '', '']
-    priv_asm_data = ""
+    try:
+        asm_sig = ret_list_of_dicts['asm_sig']
+    except KeyError:
+        asm_sig = '\n'
 
-    if check:
-        test_gen = plugin.plugin_object.generate_asm()
+    # create the list of compile_macros of the test
+    if 'rv64' in isa.lower():
+        compile_macros = ['XLEN=64']
+    else:
+        compile_macros = ['XLEN=32']
 
-        seq = '001'
-        for ret_list_of_dicts in test_gen:
-            test_name = t_name + '-' + seq
+    # if self_checking is included in returned dictionary, set the value accordingly
+    # else, default it to False
+    try:
+        self_checking = ret_list_of_dicts['self_checking']
+    except KeyError:
+        self_checking = False
 
-            assert isinstance(ret_list_of_dicts, dict)
-            # Checking for the returned sections from each test
-            asm_code = ret_list_of_dicts['asm_code']
+    # macros understood by the headers, indexed once per run
+    available_macros = worker_state['compile_macros']
 
-            try:
-                if ret_list_of_dicts['name_postfix']:
-                    inst_name_postfix = '-' + ret_list_of_dicts['name_postfix']
-                else:
-                    inst_name_postfix = ''
-            except KeyError:
-                inst_name_postfix = ''
-
-            # add inst name to test name as postfix
-            test_name = test_name + inst_name_postfix
-            logger.debug(f'Selected test: {test_name}')
-
-            try:
-                asm_data = ret_list_of_dicts['asm_data']
-            except KeyError:
-                asm_data = rvtest_data(bit_width=0, num_vals=1, random=True)
-
-            try:
-                asm_sig = ret_list_of_dicts['asm_sig']
-            except KeyError:
-                asm_sig = '\n'
-
-            # create an entry in the compile_macros dict
-            if 'rv64' in isa.lower():
-                compile_macros_dict[test_name] = ['XLEN=64']
-            else:
-                compile_macros_dict[test_name] = ['XLEN=32']
-            
-            # if self_checking is included in returned dictionary, set the value accordingly
-            # else, default it to False
-            try:
-                self_checking_dict[test_name] = ret_list_of_dicts['self_checking']
-            except KeyError:
-                self_checking_dict[test_name] = False
-
-            list_of_env_paths = [join(dirname(__file__), 'env/arch_test_unpriv.h'),
-                                 join(dirname(__file__), 'env/arch_test_priv.h')]
-            
-            try:
-                available_macros = macros_parser(list_of_env_paths)
-                for i in ret_list_of_dicts['compile_macros']:
-                    if i not in available_macros:
-                        logger.error(f'{i}: Macro undefined in arch_test.h ')
-                        raise Exception('Undefined Macro')
-                        exit()
-                compile_macros_dict[test_name] += ret_list_of_dicts[
-                    'compile_macros']
-            except KeyError:
-                logger.debug(f'No custom Compile macros specified for '
-                             f'{test_name}')
-
-            # generate and setup page tables based on info from plugin
-            privileged_dict = {'page_size': 4096,
-                               'll_pages': 64,
-                               'paging_mode': 'sv39',
-                               'mode': 'machine',
-                               'enable': False}
-            try:
-                privileged_dict = ret_list_of_dicts['privileged_test']
-            except KeyError:
-                privileged_dict['enable'] = False
-            
-            # check to add privileged_test macro in compile macros list
-
-            if privileged_dict['enable'] == True or \
-               ('rvtest_mtrap_routine' in compile_macros_dict[test_name]) or \
-               ('rvtest_strap_routine' in compile_macros_dict[test_name]):
-                   logger.debug('This test is a privileged test. Including arch_test_priv header')
-                   compile_macros_dict[test_name] += ['privileged_test_enable']
-
-            try:
-                pt_fault = privileged_dict['fault']
-            except KeyError:
-                logger.debug("test does not generate a PT fault")
-                pt_fault = False
-                pass
-
-            try:
-                pt_mem_fault = privileged_dict['mem_fault']
-            except KeyError:
-                pt_mem_fault = False
-                pass
-
-            try:
-                pte_bit_dict = privileged_dict['pte_dict']
-            except KeyError:
-                pte_bit_dict = None
-                pass
-
-            try:
-                pt_megapage = privileged_dict['megapage']
-            except KeyError:
-                pt_megapage = False
-                pass
-
-            try:
-                pt_gigapage = privileged_dict['gigapage']
-            except KeyError:
-                pt_gigapage = False
-                pass
-
-            try:
-                pt_terapage = privileged_dict['terapage']
-            except KeyError:
-                pt_terapage = False
-                pass
-
-            try:
-                pt_petapage = privileged_dict['petapage']
-            except KeyError:
-                pt_petapage = False
-                pass
-
-            try:
-                pt_user_superpage = privileged_dict['user_superpage']
-            except KeyError:
-                pt_user_superpage = False
-                pass
-
-            try:
-                pt_user_supervisor_superpage = privileged_dict['user_supervisor_superpage']
-            except KeyError:
-                pt_user_supervisor_superpage =  False
-                pass
-
-            try:
-                pt_misaligned_superpage = privileged_dict['misaligned_superpage']
-            except KeyError:
-                pt_misaligned_superpage = False
-                pass
-
-            required_paging_modes = select_paging_modes(page_modes)
-            current_paging_mode = privileged_dict['paging_mode']
-
-            if privileged_dict['enable']:
-                if (privileged_dict['paging_mode'] == 'sv39') and \
-                        (privileged_dict['mode'] == 'machine'):
-                    current_paging_mode = required_paging_modes[0]
-
-                if current_paging_mode in required_paging_modes:
-                    logger.debug(f"{current_paging_mode} is in user listed " \
-                                 "paging modes")
-                    priv_asm_code, priv_asm_data = setup_pages(
-                        pte_dict=pte_bit_dict,
-                        page_size=privileged_dict['page_size'],
-                        paging_mode=current_paging_mode,
-                        valid_ll_pages=privileged_dict['ll_pages'],
-                        mode=privileged_dict['mode'],
-                        megapage=pt_megapage,
-                        gigapage=pt_gigapage,
-                        terapage=pt_terapage,
-                        petapage=pt_petapage,
-                        user_superpage=pt_user_superpage,
-                        user_supervisor_superpage=pt_user_supervisor_superpage,
-                        fault=pt_fault,
-                        mem_fault=pt_mem_fault,
-                        misaligned_superpage=pt_misaligned_superpage
-                    )
+    try:
+        for i in ret_list_of_dicts['compile_macros']:
+            # the value of a macro, as in NAME=VALUE, is not validated
+            if i.split('=', 1)[0] not in available_macros:
+                logger.error(f'{i}: Macro undefined in arch_test.h ')
+                raise Exception('Undefined Macro')
+                exit()
+        compile_macros += ret_list_of_dicts['compile_macros']
+    except KeyError:
+        logger.debug(f'No custom Compile macros specified for '
+                     f'{test_name}')
+
+    # generate and setup page tables based on info from plugin
+    privileged_dict = {'page_size': 4096,
+                       'll_pages': 64,
+                       'paging_mode': 'sv39',
+                       'mode': 'machine',
+                       'enable': False}
+    try:
+        privileged_dict = ret_list_of_dicts['privileged_test']
+    except KeyError:
+        privileged_dict['enable'] = False
 
-                else:
-                    logger.warning(
-                        f'{current_paging_mode} is not in user listed' \
-                        ' paging modes')
-                    logger.warning(f'skipping test generation for {test_name}')
-                    continue
+    # check to add privileged_test macro in compile macros list
 
-            # Adding License, includes and macros
-            # asm = license_str + includes + test_entry
-            asm = (test_format_string[0] + test_format_string[1] +
-                   test_format_string[2])
+    if privileged_dict['enable'] == True or \
+       ('rvtest_mtrap_routine' in compile_macros) or \
+       ('rvtest_strap_routine' in compile_macros):
+           logger.debug('This test is a privileged test. Including arch_test_priv header')
+           compile_macros += ['privileged_test_enable']
 
-            # Appending Coding Macros & Instructions
-            # asm += rvcode_begin + asm_code + rvcode_end
+    try:
+        pt_fault = privileged_dict['fault']
+    except KeyError:
+        logger.debug("test does not generate a PT fault")
+        pt_fault = False
+        pass
 
-            asm += test_format_string[3] + priv_asm_code[0] + \
-                   priv_asm_code[1] + asm_code + \
-                   priv_asm_code[2] + test_format_string[4]
+    try:
+        pt_mem_fault = privileged_dict['mem_fault']
+    except KeyError:
+        pt_mem_fault = False
+        pass
 
-            # Appending RVTEST_DATA macros and data values
-            # asm += rvtest_data_begin + asm_data + rvtest_data_end
-            asm += test_format_string[5] + asm_data + priv_asm_data + \
-                   test_format_string[6]
+    try:
+        pte_bit_dict = privileged_dict['pte_dict']
+    except KeyError:
+        pte_bit_dict = None
+        pass
 
-            # Appending RVMODEL macros
-            # asm += rvmodel_data_begin + asm_sig + rvmodel_data_end
+    try:
+        pt_megapage = privileged_dict['megapage']
+    except KeyError:
+        pt_megapage = False
+        pass
 
-            asm += test_format_string[7] + asm_sig + \
-                   test_format_string[8]
+    try:
+        pt_gigapage = privileged_dict['gigapage']
+    except KeyError:
+        pt_gigapage = False
+        pass
 
-            mkdir(join(work_tests_dir, test_name))
-            with open(join(work_tests_dir, test_name, test_name + '.S'),
-                      'w') as f:
-                f.write(asm)
-            seq = '%03d' % (int(seq, 10) + 1)
-            logger.debug(f'Generating test for {test_name}')
+    try:
+        pt_terapage = privileged_dict['terapage']
+    except KeyError:
+        pt_terapage = False
+        pass
 
-            try:
-                make_file[module].append(test_name)
+    try:
+        pt_petapage = privileged_dict['petapage']
+    except KeyError:
+        pt_petapage = False
+        pass
 
-            except KeyError:
-                make_file[module] = process_manager.list([test_name])
+    try:
+        pt_user_superpage = privileged_dict['user_superpage']
+    except KeyError:
+        pt_user_superpage = False
+        pass
 
-            make_file['tests'].append(
-                (test_name,
-                 dump_makefile(isa=isa,
-                               link_path=linker_dir,
-                               test_path=join(work_tests_dir, test_name,
-                                              test_name + '.S'),
-                               test_name=test_name,
-                               compile_macros=compile_macros_dict[test_name],
-                               env_path=join(uarch_dir, 'env'),
-                               work_dir=work_dir)))
+    try:
+        pt_user_supervisor_superpage = privileged_dict['user_supervisor_superpage']
+    except KeyError:
+        pt_user_supervisor_superpage =  False
+        pass
 
-        module_test_count_dict[f'{t_name}'] = (int(seq)) - 1
+    try:
+        pt_misaligned_superpage = privileged_dict['misaligned_superpage']
+    except KeyError:
+        pt_misaligned_superpage = False
+        pass
 
-    else:
+    required_paging_modes = select_paging_modes(page_modes)
+    current_paging_mode = privileged_dict['paging_mode']
+
+    # arguments for setup_pages. None when the test does not need page tables
+    page_setup = None
+
+    if privileged_dict['enable']:
+        if (privileged_dict['paging_mode'] == 'sv39') and \
+                (privileged_dict['mode'] == 'machine'):
+            current_paging_mode = required_paging_modes[0]
+
+        if current_paging_mode in required_paging_modes:
+            logger.debug(f"{current_paging_mode} is in user listed " \
+                         "paging modes")
+            page_setup = dict(
+                pte_dict=pte_bit_dict,
+                page_size=privileged_dict['page_size'],
+                paging_mode=current_paging_mode,
+                valid_ll_pages=privileged_dict['ll_pages'],
+                mode=privileged_dict['mode'],
+                megapage=pt_megapage,
+                gigapage=pt_gigapage,
+                terapage=pt_terapage,
+                petapage=pt_petapage,
+                user_superpage=pt_user_superpage,
+                user_supervisor_superpage=pt_user_supervisor_superpage,
+                fault=pt_fault,
+                mem_fault=pt_mem_fault,
+                misaligned_superpage=pt_misaligned_superpage,
+                static=worker_state['static_pages']
+            )
+
+        else:
+            logger.warning(
+                f'{current_paging_mode} is not in user listed' \
+                ' paging modes')
+            logger.warning(f'skipping test generation for {test_name}')
+            return None
+
+    return {
+        'name': test_name,
+        'asm_code': asm_code,
+        'asm_data': asm_data,
+        'asm_sig': asm_sig,
+        'compile_macros': compile_macros,
+        'self_checking': self_checking,
+        'page_setup': page_setup
+    }
+
+
+def render_test(args):
+    """
+        creates the page tables of a prepared test, writes the Assembly test
+        file and returns the TestRecord of the test, along with the time spent
+        in setting up the pages and writing the test.
+        The test is written by the TestRenderer of the module.
+    """
+    # unpacking the args tuple
+    test, work_tests_dir, module, linker_dir, uarch_dir, work_dir = args
+
+    test_name = test['name']
+
+    # data section for paging pages
+    priv_asm_code = ['', '', '']
+    priv_asm_data = ""
+
+    # inputs linked along with the test
+    extra_compile = []
+
+    test_stats = {'test': test_name, 'setup_pages': 0.0}
+    start = perf_counter()
+    if test['page_setup'] is not None:
+        priv_asm_code, priv_asm_data = memoized_setup_pages(
+            test['page_setup'], worker_state['pages_dir'])
+        test_stats['setup_pages'] = perf_counter() - start
+        if test['page_setup']['static'] and \
+                test['page_setup']['mode'] != 'machine':
+            extra_compile.append(join(work_dir, 'page_tables.ld'))
+        if worker_state['shared_pages'] and priv_asm_data:
+            # the page tables are linked from the object shared by the tests
+            # with the same layout, instead of being a part of the test
+            extra_compile.append(
+                create_shared_page_tables(priv_asm_data,
+                                          join(work_dir, 'page_tables')))
+            priv_asm_data = ''
+
+    start = perf_counter()
+    mkdir(join(work_tests_dir, test_name))
+    worker_state['renderers'][module].write(
+        join(work_tests_dir, test_name, test_name + '.S'),
+        asm_code=test['asm_code'],
+        asm_data=test['asm_data'],
+        asm_sig=test['asm_sig'],
+        priv_asm_code=priv_asm_code,
+        priv_asm_data=priv_asm_data)
+    test_stats['write'] = perf_counter() - start
+    logger.debug(f'Generating test for {test_name}')
+
+    return TestRecord(name=test_name,
+                      module=module,
+                      compile_macros=test['compile_macros'],
+                      self_checking=test['self_checking'],
+                      extra_compile=extra_compile), test_stats
+
+
+def start_plugin(args, stats):
+    """
+        runs the execute method of a plugin.
+        Returns a tuple of the module, the name of the plugin file, the name of
+        the test class and an iterator over the prepared tests yielded by the
+        generate_asm method of the plugin. The iterator is None when the plugin
+        is not valid for the DUT configuration.
+    """
+    module = args[2]
+    plugin = worker_state['registry'].plugin(module, args[0])
+    stats.update({
+        'module': module,
+        'plugin': plugin.name,
+        'execute': 0.0,
+        'generate_asm': 0.0,
+        'prepare_test': 0.0
+    })
+
+    config_dict = worker_state['config_dict']
+
+    # seeding per plugin keeps the random values of a plugin independent of
+    # the process and the order in which the plugins are run.
+    if worker_state['seed'] is not None:
+        random_seed(f'{worker_state["seed"]}-{module}-{plugin.name}')
+
+    # actual generation process
+    start = perf_counter()
+    check = plugin.plugin_object.execute(config_dict)
+    stats['execute'] = perf_counter() - start
+
+    name = (str(plugin.plugin_object).split(".", 1))
+    t_name = ((name[1].split(" ", 1))[0])
+
+    def plugin_tests():
+        test_gen = plugin.plugin_object.generate_asm()
+
+        seq = '001'
+        start = perf_counter()
+        for ret_list_of_dicts in test_gen:
+            stats['generate_asm'] += perf_counter() - start
+            start = perf_counter()
+            test = prepare_test(t_name, seq, ret_list_of_dicts)
+            stats['prepare_test'] += perf_counter() - start
+            if test is not None:
+                yield test
+                seq = '%03d' % (int(seq, 10) + 1)
+            start = perf_counter()
+        stats['generate_asm'] += perf_counter() - start
+
+    if not check:
         logger.warning(f'{t_name} is not valid for the current core '
                        'configuration')
+        return module, plugin.name, t_name, None
+
+    return module, plugin.name, t_name, plugin_tests()
+
+
+def asm_collection_process(args):
+    """
+        runs the generate_asm method of a plugin and streams every test it
+        yields back to the parent, through the test queue of the worker, as
+        soon as the test is prepared. The tests are rendered across the pool
+        by the parent.
+        Every test is sent as ('test', module, plugin name, index, test). The
+        tests of a plugin are followed by ('done', module, plugin name, test
+        class name, valid, stats), even when the plugin fails. valid is False
+        when the plugin is not valid for the DUT configuration.
+    """
+    start = perf_counter()
+    peak_at_start = peak_rss()
+    stats = {}
+    test_queue = worker_state['test_queue']
+    module, plugin_name, t_name, valid = args[2], args[0], None, False
+    try:
+        module, plugin_name, t_name, tests = start_plugin(args, stats)
+        valid = tests is not None
+        for index, test in enumerate(tests or []):
+            # the test is sent to other processes. Hence, the sections which
+            # are iterables of chunks are collected into lists.
+            test_queue.put(('test', module, plugin_name, index, dict(test, **{
+                section: list(test[section])
+                for section in ('asm_code', 'asm_data', 'asm_sig')
+                if not isinstance(test[section], str)
+            })))
+    finally:
+        stats['wall'] = perf_counter() - start
+        stats.update(rss_stats(peak_at_start))
+        test_queue.put(('done', module, plugin_name, t_name, valid, stats))
+
+
+def asm_generation_process(args):
+    """
+        for every plugin, a task shall be submitted to the generation pool.
+        The task shall create the Assembly test files of the plugin. Every test
+        is written as soon as the plugin yields it.
+        Returns a tuple of the module, the name of the plugin file, the name of
+        the test class, the list of TestRecords of the tests generated and the
+        timing stats of the task. The list is None when the plugin is not valid
+        for the DUT configuration.
+    """
+    start = perf_counter()
+    peak_at_start = peak_rss()
+    stats = {}
+    module, plugin_name, t_name, tests = start_plugin(args, stats)
+
+    records = None
+    if tests is not None:
+        rendered = [render_test((test,) + args[1:]) for test in tests]
+        records = [record for record, _ in rendered]
+        stats['tests'] = [test_stats for _, test_stats in rendered]
 
     logger.debug(f'Finished Generating Assembly Files for {t_name}')
 
-    return True
+    stats['wall'] = perf_counter() - start
+    stats.update(rss_stats(peak_at_start))
+
+    return module, plugin_name, t_name, records, stats
 
 
 def sv_generation_process(args):
     """
         for every plugin, a process shall be spawned.
         The process shall generate System Verilog coverpoints
+        Returns the coverpoints of the plugin, None if there are none, along
+        with the timing stats of the process.
     """
+    task_start = perf_counter()
+    peak_at_start = peak_rss()
     # unpack the args
     plugin = args[0]
     config_dict = args[1]
     alias_dict = args[3]
-    cover_list = args[4]
-
+    module = args[4]
+    stats = {
+        'module': module,
+        'plugin': plugin.name,
+        'execute': 0.0,
+        'generate_covergroups': 0.0
+    }
+
+    _sv = None
+    start = perf_counter()
     _check = plugin.plugin_object.execute(config_dict)
+    stats['execute'] = perf_counter() - start
     _name = (str(plugin.plugin_object).split(".", 1))
     _test_name = ((_name[1].split(" ", 1))[0])
     if _check:
         try:
+            start = perf_counter()
             _sv = plugin.plugin_object.generate_covergroups(alias_dict)
-            cover_list.append(_sv)
+            stats['generate_covergroups'] = perf_counter() - start
             logger.debug(f'Generating coverpoints SV file for {_test_name}')
 
         except AttributeError:
@@ -307,11 +482,17 @@ def sv_generation_process(args):
         logger.critical(f'Skipped {_test_name} as this test is not '
                         f'created for the current DUT configuration ')
 
-    return True
+    stats['wall'] = perf_counter() - task_start
+    stats.update(rss_stats(peak_at_start))
+
+    return _sv, stats
 
 
 def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
-                   modules_dir, index_path, paging_modes, jobs):
+                   modules_dir, index_path, paging_modes, jobs, fan_out=False,
+                   use_cache=True, seed=None, profile=False,
+                   static_pages=False, shared_pages=False, ninja=False,
+                   stream_test_list=False):
     """
     The function generates ASM files for all the test classes specified within
     the module_dir. The user can also select the modules for which he would want
@@ -323,6 +504,50 @@ def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
     generator also creates a linker file as well as the header files for running
     the ASM files on the DUT, when required. Finally, the test generator only
     generates the tests whose targets are implemented in the DUT.
+
+    When fan_out is set, the tests yielded by a plugin are rendered by all the
+    processes of the pool instead of the process running the plugin. Every
+    test is streamed back to the parent as soon as the plugin yields it, and
+    is submitted to the pool for rendering right away.
+
+    Unless use_cache is False, the tests of a plugin are regenerated only when
+    the plugin (or the other python files of its module), the DUT configuration,
+    the version of UATG, the paging modes or the seed have changed since the
+    previous run on the work directory. The seed, when specified, seeds the
+    random module before every plugin is run. The tests are reused only when
+    the seed is specified, since the plugins using random values create new
+    tests in every unseeded run.
+
+    The wall time of every plugin is recorded in the work directory. The
+    plugins which took the longest in the previous runs are submitted to the
+    pool first, so that a slow plugin is not left running alone at the end.
+    The time spent in every phase of the plugins run, and of their tests, is
+    reported in generation_report.json and generation_report.csv within the
+    work directory.
+
+    When profile is set, every task of the pool is run under cProfile. The
+    profiles of all the processes are merged into generate.prof and
+    generate.collapsed within the profile directory of the work directory.
+
+    When static_pages is set, the page tables of the privileged tests are
+    initialised in their data sections, instead of being filled by the tests
+    at runtime. The PTEs are defined by the page_tables.ld linker script in the
+    work directory, which is linked along with the tests.
+
+    When shared_pages is set, the page tables are not a part of the tests.
+    Every distinct layout of the page tables is written once, to the
+    page_tables directory of the work directory, and the object file of the
+    layout is linked along with the tests using it.
+
+    The compile list of the tests, which is read by the compile runner of
+    uatg.test_compiler, is written to compile_list.json in the work directory.
+
+    When ninja is set, a build.ninja file which builds the ELF of every test is
+    created in the work directory along with the makefile.
+
+    The test_list is created from the records of the generated tests. When
+    stream_test_list is set, its entries are written to the test_list.yaml
+    one at a time, instead of being collected into a dictionary first.
     """
     uarch_dir = dirname(__file__)
 
@@ -347,120 +572,267 @@ def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
 
     logger.info('The modules are {0}'.format((', '.join(modules))))
 
-    # creating a shared dictionary which can be accessed by all processes
-    # stores the makefile commands
+    # creating a dictionary which stores the records of the tests of every
+    # module, for the makefile. populated from the records returned by the
+    # generation pool
 
-    make_file = process_manager.dict({
-        'all': modules,
-        'tests': (process_manager.list())
-    })
-
-    # creating a shared dict to store test_list info
-    # test_list_dict = process_manager.dict()
-    test_list_dict = {}
-
-    # creating a shared compile_macros dict
-    # this dictionary will contain all the compile macros for each test
-    compile_macros_dict = process_manager.dict()
-
-    # Create a shared self_checking flag dict
-    # this dictionary will store the status of self_check flag for each test
-    self_checking_dict = process_manager.dict()
+    make_file = {'all': modules, 'page_tables': set()}
 
     if exists(join(work_dir, 'makefile')):
         remove(join(work_dir, 'makefile'))
+    if exists(join(work_dir, 'build.ninja')):
+        remove(join(work_dir, 'build.ninja'))
 
     logger.info('****** Generating Tests ******')
 
     total_test_count_dict = {}
 
+    # dicts to display the number of tests generated per plugin of a module
+    module_test_count_dicts = {}
+
+    username = getuser()
+    time = ((str(datetime.now())).split("."))[0]
+    license_str = f'# Licensing information can be found at ' \
+                  f'LICENSE.incore\n# Test generated by user - {username}' \
+                  f' at {time}\n\n'
+
+    # renderers of the tests, created once per module
+    renderers = {}
+
+    registry = plugin_registry(modules_dir, index_path)
+
+    # the generation cache stores the records of the tests of every plugin
+    # along with the digest of all the inputs which were used to create them.
+    cache_path = join(work_dir, '.uatg_cache', 'generation.json')
+    generation_cache = load_json_cache(cache_path)
+    # without a seed, the plugins using random values are expected to create
+    # new tests in every run. Hence, the tests are reused only when seeded.
+    reuse_tests = use_cache and seed is not None
+    run_digest = config_hash({
+        'config': config_dict,
+        'version': __version__,
+        'paging_modes': select_paging_modes(paging_modes),
+        'seed': seed,
+        'static_pages': static_pages,
+        'shared_pages': shared_pages,
+        'record_fields': TestRecord._fields,
+        'dirs': [linker_dir, uarch_dir, work_dir]
+    })
+    cache_keys = {}
+    results = []
+
+    # wall time (in seconds) taken by every plugin, in the previous runs.
+    timings_path = join(work_dir, '.uatg_cache', 'timings.json')
+    timings = load_json_cache(timings_path)
+    # timing stats of the plugins run by the pool
+    report = []
+
+    # The plugins of all the modules are loaded before the generation pool is
+    # created. The tasks of every module are then run by the same pool.
+    arg_list = []
     for module in modules:
 
-        # creating a shared list to display the number of tests generated
-        # per module
-        module_test_count_dict = process_manager.dict()
+        module_test_count_dicts[module] = {}
+        make_file[module] = []
 
         module_dir = join(modules_dir, module)
         work_tests_dir = join(work_dir, module)
 
-        # initializing make commands for individual modules
-
-        logger.debug(f'Directory for {module} is {module_dir}')
-        logger.info(f'Starting plugin Creation for {module}')
-        create_plugins(plugins_path=module_dir,
-                       index_yaml=index_path,
-                       module=module)
-        logger.info(f'Created plugins for {module}')
-        username = getuser()
-        time = ((str(datetime.now())).split("."))[0]
-        license_str = f'# Licensing information can be found at ' \
-                      f'LICENSE.incore\n# Test generated by user - {username}' \
-                      f' at {time}\n\n'
-        includes = f'#include \"model_test.h\" \n#include \"arch_test_unpriv.h\"\n'
-        test_entry = f'RVTEST_ISA(\"{isa}\")\n\n.section .text.init\n.globl' \
-                     f' rvtest_entry_point\nrvtest_entry_point:'
-
-        rvcode_begin = '\nRVMODEL_BOOT\nRVTEST_CODE_BEGIN\n'
-        rvcode_end = '\nRVTEST_CODE_END\nRVMODEL_HALT\n\n'
-        rvtest_data_begin = '\nRVTEST_DATA_BEGIN\n'
-        rvtest_data_end = '\nRVTEST_DATA_END\n\n'
-        rvmodel_data_begin = '\nRVMODEL_DATA_BEGIN\n'
-        rvmodel_data_end = '\nRVMODEL_DATA_END\n\n'
-
-        # This function adds module directory to python path
-        def add_module_to_path(plugin_info):
-            import sys
-            from os.path import dirname
-            sys.path.insert(0, dirname(plugin_info.path))
-
-        manager = PluginManager()
-        logger.debug('Loaded PluginManager')
-        manager.setPluginPlaces([module_dir])
-        # plugins are stored in module_dir
-        manager.locatePlugins()
-        
-        # passing add_module_to_path to callback ensures the run of the function
-        # before the plugin is loaded
-        x = manager.loadPlugins(callback=add_module_to_path)
-        error_status = [i.error for i in x if i.error is not None]
-
-        if len(error_status) > 0:
-            for i in error_status:
-                logger.error(str(i[0]) + ' : ' + str(i[1]))
-            exit('Python Errors at one/multiple files')
-
-        # check if prior test files are present and remove them. create new dir.
+        plugins = registry.plugins(module)
+
+        renderers[module] = TestRenderer.for_module(
+            isa, license_str, join(module_dir, 'skeleton.yaml'))
+
+        # the helper python files and the skeleton of a module are a part of
+        # every plugin's key
+        module_digest = module_hash(module_dir)
+
+        module_cache = generation_cache.get(module, {})
+        cached_tests = set()
+        for plugin in plugins:
+            key = file_hash([plugin.path + '.py']) + module_digest + run_digest
+            cache_keys[(module, plugin.name)] = key
+            entry = module_cache.get(plugin.name)
+            if not reuse_tests or entry is None or entry['key'] != key:
+                continue
+            records = entry['records']
+            if records is not None:
+                records = [TestRecord(*record) for record in records]
+                if not all(
+                        isfile(join(work_tests_dir, record.name, record.name +
+                                    '.S')) for record in records):
+                    continue
+                # the shared page tables linked by the tests
+                if not all(
+                        isfile(splitext(path)[0] + '.S') for record in records
+                        for path in record.extra_compile
+                        if path.endswith('.o')):
+                    continue
+                cached_tests.update(record.name for record in records)
+            logger.debug(f'Reusing the cached tests of {plugin.name}')
+            results.append((module, plugin.name, entry['t_name'], records))
+
+        # check if prior test files are present and remove them, retaining the
+        # tests of the plugins which are cached. create new dir.
         if (isdir(work_tests_dir)) and \
                 exists(work_tests_dir):
-            rmtree(work_tests_dir)
-
-        mkdir(work_tests_dir)
-
-        logger.info(f'Generating assembly tests for {module}')
-
-        # test format strings
-        test_format_string = [
-            license_str, includes, test_entry, rvcode_begin, rvcode_end,
-            rvtest_data_begin, rvtest_data_end, rvmodel_data_begin,
-            rvmodel_data_end
-        ]
+            for test_dir in listdir(work_tests_dir):
+                if test_dir in cached_tests:
+                    continue
+                if isdir(join(work_tests_dir, test_dir)):
+                    rmtree(join(work_tests_dir, test_dir))
+                else:
+                    remove(join(work_tests_dir, test_dir))
+        else:
+            mkdir(work_tests_dir)
 
         # Loop around and find the plugins and writes the contents from the
         # plugins into an asm file
-        arg_list = []
-        for plugin in manager.getAllPlugins():
+        cached_plugins = {result[1] for result in results
+                          if result[0] == module}
+        for plugin in plugins:
+            if plugin.name in cached_plugins:
+                continue
             arg_list.append(
-                (plugin, config_dict, isa, test_format_string,
-                 work_tests_dir, make_file, module, linker_dir, uarch_dir,
-                 work_dir, compile_macros_dict, self_checking_dict, module_test_count_dict,
-                 paging_modes))
-
-        # multi processing process pool
-        logger.info(f"Spawning {jobs} processes")
-        process_pool = Pool(jobs)
-        # creating a map of processes
-        process_pool.map(asm_generation_process, arg_list)
-        process_pool.close()
+                (plugin.name, work_tests_dir, module, linker_dir, uarch_dir,
+                 work_dir))
+
+        logger.info(f'{len(cached_plugins)} plugin(s) of {module} are '
+                    f'unchanged since the previous run')
+
+    logger.info('Generating assembly tests for '
+                f'{", ".join(modules)}')
+
+    # longest job first. The plugins without a recorded time are submitted
+    # before the rest, as their cost is unknown.
+    arg_list.sort(key=lambda args: -timings.get(args[2], {}).get(
+        args[0], float('inf')))
+
+    profile_dir = None
+    if profile:
+        profile_dir = join(work_dir, 'profile', 'generate')
+        create_profile_dir(profile_dir)
+
+    # the compile macros of the tests are validated against the macros tested
+    # by the headers of the environment and the user's model_test.h
+    macro_headers = [
+        join(uarch_dir, 'env', 'arch_test_unpriv.h'),
+        join(uarch_dir, 'env', 'arch_test_priv.h')
+    ]
+    if linker_dir and isfile(join(linker_dir, 'model_test.h')):
+        macro_headers.append(join(linker_dir, 'model_test.h'))
+    compile_macros = compile_macro_index(macro_headers)
+
+    # the page tables of the distinct page setups are built once per worker,
+    # and persisted in the work directory along with the generation cache.
+    pages_dir = join(work_dir, '.uatg_cache', 'pages') if use_cache else None
+    logger.debug(f'{len(compile_macros)} compile macros found in '
+                 f'{", ".join(macro_headers)}')
+
+    # multi processing process pool, shared by the plugins of all the modules
+    logger.info(f"Spawning {jobs} processes")
+    test_queue = Queue() if fan_out else None
+    process_pool = Pool(jobs, *profiled_initializer(
+        init_generation_worker,
+        (config_dict, isa, paging_modes, seed, modules_dir, index_path,
+         compile_macros, renderers, pages_dir, static_pages, shared_pages,
+         test_queue),
+        profile_dir))
+    if fan_out:
+        # the tests of a plugin are streamed back by the worker running the
+        # plugin as they are yielded, and are rendered across the pool as soon
+        # as they arrive.
+        collection = process_pool.map_async(*profiled(
+            asm_collection_process, arg_list, profile_dir),
+                                            chunksize=1)
+        # (module, plugin name, index) of the streamed tests, by test name
+        streamed = {}
+        # (test class name, valid, stats) of the plugins which are done
+        collected = {}
+
+        def streamed_tests():
+            while len(collected) < len(arg_list):
+                message = test_queue.get()
+                if message[0] == 'done':
+                    collected[message[1:3]] = message[3:]
+                    continue
+                _, module, plugin_name, index, test = message
+                streamed[test['name']] = (module, plugin_name, index)
+                yield (test, join(work_dir, module), module, linker_dir,
+                       uarch_dir, work_dir)
+
+        rendered = {}
+        for record, test_stats in process_pool.imap_unordered(*profiled(
+                render_test, streamed_tests(), profile_dir)):
+            module, plugin_name, index = streamed[record.name]
+            rendered.setdefault((module, plugin_name), []).append(
+                (index, record, test_stats))
+        # raises the errors of the plugins
+        collection.get()
+
+        generated = []
+        for (module, plugin_name), (t_name, valid, stats) in \
+                collected.items():
+            timings.setdefault(module, {})[plugin_name] = stats['wall']
+            report.append(stats)
+            records = None
+            if valid:
+                tests = sorted(rendered.get((module, plugin_name), []),
+                               key=lambda test: test[0])
+                records = [record for _, record, _ in tests]
+                stats['tests'] = [test_stats for _, _, test_stats in tests]
+            generated.append((module, plugin_name, t_name, records))
+    else:
+        # creating a map of processes. The tasks are handed out one at a time,
+        # in the order of the arg_list.
+        generated = []
+        for module, plugin_name, t_name, records, stats in \
+                process_pool.imap_unordered(*profiled(
+                    asm_generation_process, arg_list, profile_dir),
+                                            chunksize=1):
+            timings.setdefault(module, {})[plugin_name] = stats['wall']
+            report.append(stats)
+            generated.append((module, plugin_name, t_name, records))
+    process_pool.close()
+    process_pool.join()
+
+    results += generated
+    dump_json_cache(timings_path, timings)
+
+    if profile:
+        merge_profiles(profile_dir, join(work_dir, 'profile', 'generate'))
+
+    # the cache of a module is rebuilt, dropping the plugins which are removed
+    # or disabled
+    for module in modules:
+        generation_cache[module] = {}
+    for module, plugin_name, t_name, records in results:
+        if seed is None:
+            # the unseeded tests are never reused
+            continue
+        generation_cache[module][plugin_name] = {
+            'key': cache_keys[(module, plugin_name)],
+            't_name': t_name,
+            'records': records
+        }
+    dump_json_cache(cache_path, generation_cache)
+
+    # merge the records of the generated tests, in the order of the modules
+    results.sort(key=lambda result: (modules.index(result[0]), result[2]))
+    for module, plugin_name, t_name, records in results:
+        if records is None:
+            continue
+        module_test_count_dicts[module][t_name] = len(records)
+        for record in records:
+            make_file[module].append(record)
+            # the shared page table objects linked by the test
+            make_file['page_tables'].update(
+                path for path in record.extra_compile if path.endswith('.o'))
+
+    # the makefile and the test_list need every test of a module, hence the
+    # reports are generated once the pool has finished all the tasks.
+    for module in modules:
+        module_test_count_dict = module_test_count_dicts[module]
 
         logger.info('\n****** Count of assembly tests generated (per plugin) '
                     f'for {module} ******')
@@ -478,35 +850,47 @@ def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
 
         logger.info(f'Finished Generating Assembly Tests for {module}')
 
-        if test_list:
-            logger.info(f'Creating test_list for the {module}')
-            test_list_dict.update(
-                generate_test_list(work_tests_dir, uarch_dir, module_dir, isa,
-                                   test_list_dict, compile_macros_dict, self_checking_dict))
-
     logger.info('Assembly generation for all modules completed')
 
+    logger.info('Dumping makefile')
+    for i in modules:
+        if len(make_file[i]) == 0:
+            logger.critical(f"\"{i}\" is a part of the module list. \n"
+                            f"But, No tests were generated by UATG for "
+                            f"module \"{i}\"")
+            logger.critical("If this was uninteded, "
+                            "Please enable the required test(s) in the "
+                            "index.yaml file")
+        with open(join(work_dir, i + '.mk'), 'w') as f:
+            f.write(dump_module_makefile(i, join(work_dir, i), make_file[i]))
     with open(join(work_dir, 'makefile'), 'w') as f:
-        logger.info('Dumping makefile')
-        f.write('all' + ': ')
-        f.write(' \\\n\t'.join(make_file['all']))
-        f.write('\n')
-        for i in modules:
-            f.write(i + ': ')
-            try:
-                f.write(' \\\n\t'.join(make_file[i]))
-            except KeyError:
-                logger.critical(f"\"{i}\" is a part of the module list. \n"
-                                f"But, No tests were generated by UATG for "
-                                f"module \"{i}\"")
-                logger.critical("If this was uninteded, "
-                                "Please enable the required test(s) in the "
-                                "index.yaml file")
-            f.write('\n')
-        f.write('\n')
-        for i in make_file['tests']:
-            f.write(i[0] + ': \n\t')
-            f.write(i[1] + '\n')
+        f.write(
+            dump_makefile(isa=isa,
+                          link_path=linker_dir,
+                          env_path=join(uarch_dir, 'env'),
+                          work_dir=work_dir,
+                          modules=make_file['all'],
+                          page_tables=make_file['page_tables']))
+    dump_json_cache(
+        join(work_dir, 'compile_list.json'),
+        dump_compile_list(isa=isa,
+                          link_path=linker_dir,
+                          env_path=join(uarch_dir, 'env'),
+                          work_dir=work_dir,
+                          modules=make_file['all'],
+                          records=make_file,
+                          page_tables=make_file['page_tables']))
+    if ninja:
+        logger.info('Dumping build.ninja')
+        with open(join(work_dir, 'build.ninja'), 'w') as f:
+            f.write(
+                dump_ninja(isa=isa,
+                           link_path=linker_dir,
+                           env_path=join(uarch_dir, 'env'),
+                           work_dir=work_dir,
+                           modules=make_file['all'],
+                           records=make_file,
+                           page_tables=make_file['page_tables']))
 
     if linker_dir and isfile(join(linker_dir, 'link.ld')):
         logger.info('Using user specified linker: ' +
@@ -523,11 +907,24 @@ def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
     else:
         create_model_test_h(target_dir=work_dir)
         logger.info(f'Creating Model_test.h file at {work_dir}')
+
+    if static_pages:
+        create_page_table_symbols(target_dir=work_dir)
+        logger.info(f'Creating page_tables.ld file at {work_dir}')
     if test_list:
         logger.info('Test List was generated by UATG. You can find it in '
                     f'the work dir{work_dir}')
+        test_list_entries = generate_test_list(
+            work_dir, uarch_dir, modules_dir, isa,
+            {module: make_file[module] for module in modules})
         with open(join(work_dir, 'test_list.yaml'), 'w') as outfile:
-            dump(test_list_dict, outfile)
+            if stream_test_list:
+                # the entries are in the order of the test names, as in the
+                # dump of the complete test list
+                for test_name, test_entry in test_list_entries:
+                    dump({test_name: test_entry}, outfile)
+            else:
+                dump(dict(test_list_entries), outfile)
     else:
         logger.info('Test list will not be generated by uatg')
 
@@ -543,11 +940,15 @@ def generate_tests(work_dir, linker_dir, modules, config_dict, test_list,
         f'\nTotal number of tests generated by UATG in this run : '
         f'{sum([v for v in total_test_count_dict.values()])}\n\n')
 
+    if report:
+        dump_timing_report(join(work_dir, 'generation_report'), report)
+
     logger.info('****** Finished Generating Tests and other dependencies'
                 ' ******')
 
 
-def generate_sv(work_dir, config_dict, modules, modules_dir, alias_dict, jobs):
+def generate_sv(work_dir, config_dict, modules, modules_dir, alias_dict, jobs,
+                index_path=None, profile=False):
     """
     The generate_sv function dumps the covergroups written by the user into a
     'coverpoints.sv' file present within the 'sv_top' directory within the work
@@ -557,6 +958,10 @@ def generate_sv(work_dir, config_dict, modules, modules_dir, alias_dict, jobs):
     select the modules for which covergroups are to be generated.
     In addition, the method also takes in an alias_dict which can be used to
     alias the BSV signal names to something even more comprehensible.
+    The time spent by every plugin is reported in coverage_report.json and
+    coverage_report.csv within the work directory.
+    When profile is set, the processes are profiled like in generate_tests,
+    and the profiles are merged into coverage.prof and coverage.collapsed.
     """
     uarch_dir = dirname(__file__)
 
@@ -581,52 +986,117 @@ def generate_sv(work_dir, config_dict, modules, modules_dir, alias_dict, jobs):
         logger.debug("Removing Existing coverpoints SV file")
         remove(sv_file)
 
-    # create a shared list for storing the coverpoints
-    cover_list = process_manager.list()
-
-    for module in modules:
-        logger.debug(f'Generating CoverPoints for {module}')
-
-        module_dir = join(modules_dir, module)
+    # create a list for storing the coverpoints
+    cover_list = []
+    # timing stats of the plugins
+    report = []
 
-        # yaml file with core parameters
-        core_yaml = config_dict['core_config']
+    profile_dir = None
+    if profile:
+        profile_dir = join(work_dir, 'profile', 'coverage')
+        create_profile_dir(profile_dir)
 
-        manager = PluginManager()
-        manager.setPluginPlaces([module_dir])
-        manager.locatePlugins()
-        x = manager.loadPlugins()
-        error_status = [i.error for i in x if i.error is not None]
+    # yaml file with core parameters
+    core_yaml = config_dict['core_config']
 
-        if len(error_status) > 0:
-            for i in error_status:
-                logger.error(str(i[0]) + ' : ' + str(i[1]))
-            exit('Python Errors at one/multiple files')
+    # The plugins of all the modules are run by the same pool. Hence, a
+    # profiled worker dumps its profile once, and the profiles of the workers
+    # are not overwritten when a PID is reused by a later pool.
+    arg_list = []
+    for module in modules:
+        logger.debug(f'Generating CoverPoints for {module}')
 
         # Loop around and find the plugins and writes the contents from the
         # plugins into an asm file
-        arg_list = []
-        for plugin in manager.getAllPlugins():
+        for plugin in plugin_registry(modules_dir, index_path).plugins(module):
             arg_list.append(
-                (plugin, core_yaml, isa_yaml, alias_dict, cover_list))
-
-        # multi processing process pool
-        logger.debug(f"Spawning {jobs} processes")
-        process_pool = Pool(jobs)
-        # creating a map of processes
-        process_pool.map(sv_generation_process, arg_list)
-        process_pool.close()
+                (plugin, core_yaml, isa_yaml, alias_dict, module))
+
+    # multi processing process pool
+    logger.debug(f"Spawning {jobs} processes")
+    process_pool = Pool(jobs, *profiled_initializer(None, (), profile_dir))
+    # creating a map of processes. The covergroups are in the order of the
+    # modules and their plugins.
+    for _sv, stats in process_pool.map(
+            *profiled(sv_generation_process, arg_list, profile_dir)):
+        report.append(stats)
+        if _sv is not None:
+            cover_list.append(_sv)
+    process_pool.close()
+    process_pool.join()
 
-        logger.debug(f'Finished Generating Coverpoints for {module}')
+    logger.debug('Finished Generating Coverpoints')
 
     with open(sv_file, 'w') as f:
         logger.info('Dumping the covergroups into SV file')
         f.write('\n'.join(cover_list))
 
+    if report:
+        dump_timing_report(join(work_dir, 'coverage_report'), report)
+
+    if profile:
+        merge_profiles(profile_dir, join(work_dir, 'profile', 'coverage'))
+
     logger.info('****** Finished Generating Covergroups ******')
 
 
-def validate_tests(modules, config_dict, work_dir, modules_dir):
+def init_validation_worker(config_dict, modules_dir, index_path):
+    """
+        initializer for the processes of the validation pool. The DUT
+        configuration is stored within the worker once, and the plugins are
+        looked up by name from the plugin registry of the worker.
+    """
+    worker_state['registry'] = plugin_registry(modules_dir,
+                                               index_path,
+                                               optional_index=True)
+    worker_state['config_dict'] = config_dict
+
+
+def validation_process(args):
+    """
+        checks the log of the test of a plugin, and returns the module, the
+        name of the test and the status of the test. The status is 'pass' or
+        'fail' as returned by check_log, 'missing' when the log is not found,
+        'unreadable' when the log is compressed in a format which can not be
+        read, and None when the plugin generated no test.
+    """
+    # unpacking the args tuple
+    module, plugin_name, test_name, log_file_path, reports_dir = args
+
+    plugin = worker_state['registry'].plugin(module, plugin_name)
+    # YAML with ISA paramters
+    core_yaml = worker_state['config_dict']['core_config']
+    # isa yaml with ISA paramters
+    isa_yaml = worker_state['config_dict']['isa_dict']
+
+    if not plugin.plugin_object.execute(core_yaml, isa_yaml):
+        return module, test_name, None
+    try:
+        result = check_test_log(plugin.plugin_object, log_file_path,
+                                reports_dir)
+    except FileNotFoundError:
+        return module, test_name, 'missing'
+    except ImportError as e:
+        logger.error(str(e))
+        return module, test_name, 'unreadable'
+    return module, test_name, 'pass' if result else 'fail'
+
+
+def log_state(log_file_path):
+    """
+        returns the size and the modification time (in ns) of a log, which
+        identify the version of the log in the validation manifest. None is
+        returned when the log is not found.
+    """
+    try:
+        log_stat = stat(log_file_path)
+    except OSError:
+        return None
+    return [log_stat.st_size, log_stat.st_mtime_ns]
+
+
+def validate_tests(modules, config_dict, work_dir, modules_dir,
+                   index_path=None, jobs=1, use_cache=True):
     """
        Parses the log returned from the DUT for finding if the tests
        were successful.
@@ -634,6 +1104,20 @@ def validate_tests(modules, config_dict, work_dir, modules_dir):
        expecting to be seen in the log generated by the DUT.
        In addition to just the checking, it can also be set up to provide a
        report for every test for which the user tries to validate.
+       The plugins which register the patterns they look for get the matches
+       of a single scan of the log, as described in uatg.log_scanner.
+       The log of a test can be compressed as log.gz or log.zst, and is then
+       decompressed as it is read.
+
+       The logs of the tests are checked by a pool of jobs processes. The
+       results are counted, and the reports are joined, by the parent.
+
+       The result of every test is recorded in manifest.json in the reports
+       directory, along with the path, size and modification time of its log
+       and the key of its plugin. Unless use_cache is False, the logs which
+       are unchanged since the previous validation, and whose plugin, module,
+       DUT configuration and report are unchanged as well, are not checked
+       again, and their previous result is reused.
     """
 
     uarch_dir = dirname(__file__)
@@ -642,7 +1126,8 @@ def validate_tests(modules, config_dict, work_dir, modules_dir):
 
     if modules == ['all']:
         logger.debug(f'Checking {modules_dir} for modules')
-        modules = list_of_modules(modules_dir)
+        modules = list_of_modules(modules_dir, index_path,
+                                  optional_index=True)
         # del modules[-1]
         # Needed if list_of_modules returns 'all' along with other modules
     if work_dir:
@@ -654,54 +1139,102 @@ def validate_tests(modules, config_dict, work_dir, modules_dir):
     _fail_ct = 0
     _tot_ct = 1
 
+    # the tests can be validated without an index file
+    registry = plugin_registry(modules_dir, index_path, optional_index=True)
+
+    # the manifest stores the result of the log of every test, along with the
+    # state of the log and the key of the plugin which checked it.
+    manifest_path = join(work_dir, 'reports', 'manifest.json')
+    manifest = load_json_cache(manifest_path) if use_cache else {}
+    run_digest = config_hash({'config': config_dict, 'version': __version__})
+
+    # The plugins of all the modules are loaded before the validation pool is
+    # created. The logs of every module are then checked by the same pool.
+    arg_list = []
+    # (module, test name, manifest entry) of every test, in order. The entry
+    # holds the previous result of the test when its log is unchanged.
+    tests = []
     for module in modules:
-        module_dir = join(modules_dir, module)
         # module_tests_dir = join(module_dir, 'tests')
         work_tests_dir = join(work_dir, module)
         reports_dir = join(work_dir, 'reports', module)
         makedirs(reports_dir, exist_ok=True)
-        # YAML with ISA paramters
-        core_yaml = config_dict['core_config']
-        # isa yaml with ISA paramters
-        isa_yaml = config_dict['isa_dict']
-        manager = PluginManager()
-        manager.setPluginPlaces([module_dir])
-        manager.locatePlugins()
-        x = manager.loadPlugins()
-        error_status = [i.error for i in x if i.error is not None]
-
-        if len(error_status) > 0:
-            for i in error_status:
-                logger.error(str(i[0]) + ' : ' + str(i[1]))
-            exit('Python Errors at one/multiple files')
 
         logger.debug(f'Minimal Log Checking for {module}')
 
-        for plugin in manager.getAllPlugins():
+        module_digest = module_hash(join(modules_dir, module))
+        module_manifest = manifest.get(module, {})
+        for plugin in registry.plugins(module):
             _name = (str(plugin.plugin_object).split(".", 1))
             _test_name = ((_name[1].split(" ", 1))[0])
-            _check = plugin.plugin_object.execute(core_yaml, isa_yaml)
-            _log_file_path = join(work_tests_dir, _test_name, 'log')
-            if _check:
-                try:
-                    _result = plugin.plugin_object.check_log(
-                        _log_file_path, reports_dir)
-                    if _result:
-                        logger.info(f'{_tot_ct}. Minimal test: {_test_name} '
-                                    f'has passed.')
-                        _pass_ct += 1
-                        _tot_ct += 1
-                    else:
-                        logger.critical(f"{_tot_ct}. Minimal test: "
-                                        f"{_test_name} has failed.")
-                        _fail_ct += 1
-                        _tot_ct += 1
-                except FileNotFoundError:
-                    logger.error(f'Log for {_test_name} not found. Run the '
-                                 f'test on DUT and generate log or check '
-                                 f'the path.')
-            else:
-                logger.warn(f'No asm generated for {_test_name}. Skipping')
+            _log_file_path = find_log(join(work_tests_dir, _test_name))
+            entry = {
+                'log': _log_file_path,
+                'state': log_state(_log_file_path),
+                'plugin': file_hash([plugin.path + '.py']) + module_digest +
+                          run_digest,
+                'report': join(reports_dir, f'{_test_name}_report.yaml')
+            }
+            previous = module_manifest.get(_test_name)
+            if entry['state'] is not None and previous is not None and all(
+                    previous.get(field) == entry[field]
+                    for field in ('log', 'state', 'plugin')) and (
+                        not previous.get('has_report') or
+                        isfile(entry['report'])):
+                logger.debug(f'Reusing the result of {_test_name}')
+                tests.append((module, _test_name, previous))
+                continue
+            tests.append((module, _test_name, entry))
+            arg_list.append((module, plugin.name, _test_name, _log_file_path,
+                             reports_dir))
+
+    logger.info(f'Checking {len(arg_list)} logs. {len(tests) - len(arg_list)}'
+                f' logs are unchanged since the previous validation')
+
+    # multi processing process pool, shared by the plugins of all the modules
+    logger.debug(f"Spawning {jobs} processes")
+    process_pool = Pool(jobs,
+                        initializer=init_validation_worker,
+                        initargs=(config_dict, modules_dir, index_path))
+    # the results are returned in the order of the tasks, so that the tests
+    # are numbered in the same order in every run.
+    results = process_pool.imap(validation_process, arg_list)
+    validated = {module: {} for module in modules}
+    for module, _test_name, entry in tests:
+        if 'status' in entry:
+            _status = entry['status']
+        else:
+            _, _, _status = next(results)
+            entry.update(status=_status, has_report=isfile(entry['report']))
+        # only the results of the logs which were checked are reusable
+        if _status in ('pass', 'fail'):
+            validated[module][_test_name] = entry
+        if _status == 'pass':
+            logger.info(f'{_tot_ct}. Minimal test: {_test_name} '
+                        f'has passed.')
+            _pass_ct += 1
+            _tot_ct += 1
+        elif _status == 'fail':
+            logger.critical(f"{_tot_ct}. Minimal test: "
+                            f"{_test_name} has failed.")
+            _fail_ct += 1
+            _tot_ct += 1
+        elif _status == 'missing':
+            logger.error(f'Log for {_test_name} not found. Run the '
+                         f'test on DUT and generate log or check '
+                         f'the path.')
+        elif _status == 'unreadable':
+            logger.error(f'Log for {_test_name} could not be read.')
+        else:
+            logger.warn(f'No asm generated for {_test_name}. Skipping')
+    process_pool.close()
+    process_pool.join()
+
+    if use_cache:
+        manifest.update(validated)
+        dump_json_cache(manifest_path, manifest)
+
+    for module in modules:
         logger.debug(f'Minimal log Checking for {module} complete')
 
     logger.info("Minimal Verification Results")
@@ -710,7 +1243,7 @@ def validate_tests(modules, config_dict, work_dir, modules_dir):
 
     if _tot_ct - 1:
         logger.info(f"Tests Passed : {_pass_ct} - "
-                    f"[{_pass_ct // (_tot_ct - 1)} %]")
+                    f"[{100 * _pass_ct // (_tot_ct - 1)} %]")
         logger.warn(f"Tests Failed : {_fail_ct} - "
                     f"[{100 * _fail_ct // (_tot_ct - 1)} %]")
     else:
@@ -742,7 +1275,7 @@ def clean_dirs(work_dir, modules_dir):
     pycache_dir = join(modules_dir, '**/__pycache__')
     logger.debug(f'yapsy_dir is {yapsy_dir}')
     logger.debug(f'pycache_dir is {pycache_dir}')
-    tf = glob(module_dir)
+    tf = glob(module_dir) + glob(join(work_dir, '.uatg_cache'))
     pf = glob(pycache_dir) + glob(join(uarch_dir, '__pycache__'))
     yf = glob(yapsy_dir, recursive=True)
     logger.debug(f'removing {tf}, {yf} and {pf}')
@@ -0,0 +1,95 @@
+# See LICENSE.incore for license details
+"""Renderer of the Assembly test files of a module."""
+
+from os.path import isfile
+
+from uatg.utils import load_yaml
+
+# sections of the skeleton which surround the sections of a test. The `{isa}`
+# within a section is replaced by the ISA string of the DUT.
+default_skeleton = {
+    'includes': '#include "model_test.h" \n#include "arch_test_unpriv.h"\n',
+    'test_entry': 'RVTEST_ISA("{isa}")\n\n.section .text.init\n.globl'
+                  ' rvtest_entry_point\nrvtest_entry_point:',
+    'code_begin': '\nRVMODEL_BOOT\nRVTEST_CODE_BEGIN\n',
+    'code_end': '\nRVTEST_CODE_END\nRVMODEL_HALT\n\n',
+    'data_begin': '\nRVTEST_DATA_BEGIN\n',
+    'data_end': '\nRVTEST_DATA_END\n\n',
+    'model_data_begin': '\nRVMODEL_DATA_BEGIN\n',
+    'model_data_end': '\nRVMODEL_DATA_END\n\n'
+}
+
+
+def encoded(section):
+    """
+        returns the section as an iterable of bytes. The section can be a
+        string or an iterable of string chunks.
+    """
+    if isinstance(section, str):
+        return [section.encode()]
+    return (chunk.encode() for chunk in section)
+
+
+class TestRenderer:
+    """
+        Writes the Assembly tests of a module. The skeleton of the tests is
+        the same for every test of a module. Hence, the parts of the skeleton
+        which lie between the sections of a test are joined and encoded once,
+        when the renderer is created, and every test is written with a single
+        writelines call.
+
+        The skeleton of a module can be customised by a skeleton.yaml file in
+        the directory of the module, which overrides any of the sections of
+        the default_skeleton.
+    """
+
+    def __init__(self, isa, license_str, skeleton=None):
+        skeleton = dict(default_skeleton, **(skeleton or {}))
+        skeleton = {
+            key: value.replace('{isa}', isa) for key, value in skeleton.items()
+        }
+        self.prefix = (license_str + skeleton['includes'] +
+                       skeleton['test_entry'] +
+                       skeleton['code_begin']).encode()
+        self.code_suffix = (skeleton['code_end'] +
+                            skeleton['data_begin']).encode()
+        self.data_suffix = (skeleton['data_end'] +
+                            skeleton['model_data_begin']).encode()
+        self.suffix = skeleton['model_data_end'].encode()
+
+    @classmethod
+    def for_module(cls, isa, license_str, skeleton_path):
+        """
+            creates the renderer of a module, using the skeleton.yaml of the
+            module when it exists.
+        """
+        skeleton = None
+        if isfile(skeleton_path):
+            skeleton = load_yaml(skeleton_path)
+        return cls(isa, license_str, skeleton)
+
+    def write(self, path, asm_code, asm_data, asm_sig, priv_asm_code=None,
+              priv_asm_data=''):
+        """
+            writes a test to path. The sections of the test are streamed to
+            the file in order, so that the complete test is never held in
+            memory. priv_asm_code holds the page table setup code to be placed
+            before and after the asm_code.
+        """
+        if priv_asm_code is None:
+            priv_asm_code = ['', '', '']
+
+        def pieces():
+            yield self.prefix
+            yield (priv_asm_code[0] + priv_asm_code[1]).encode()
+            yield from encoded(asm_code)
+            yield priv_asm_code[2].encode()
+            yield self.code_suffix
+            yield from encoded(asm_data)
+            yield priv_asm_data.encode()
+            yield self.data_suffix
+            yield from encoded(asm_sig)
+            yield self.suffix
+
+        with open(path, 'wb') as f:
+            f.writelines(pieces())
@@ -1,15 +1,24 @@
 # See LICENSE.incore for license details
 import re
-from glob import glob
-from os import remove, listdir, getcwd, chdir
-from os.path import join, abspath, exists, basename, dirname
+from csv import DictWriter
+from functools import lru_cache
+from hashlib import sha256
+from inspect import signature
+from json import load, dump
+from os import remove, listdir, getcwd, chdir, makedirs, replace, getpid
+from os.path import join, abspath, exists, dirname, getmtime, isdir, \
+    isfile, splitext
 from random import randint
 from re import findall, M
+from resource import getrusage, RUSAGE_SELF
 from shlex import split
+from shutil import which
 from subprocess import run, PIPE, CalledProcessError
+from tempfile import mkstemp
 
 from ruamel.yaml import YAML
 
+from uatg import __version__
 from uatg.log import logger
 
 
@@ -409,6 +418,23 @@ shakti_end:                                                             \
         outfile.write(out)
 
 
+def create_page_table_symbols(target_dir):
+    """
+    Creates the page_tables.ld linker script in the target directory. The
+    script defines the non leaf PTE pointing to every page table, which is used
+    by the tests with static page tables. The script is to be passed to the
+    linker as an input file, along with the test.
+    """
+    out = '/* PTEs of the page tables initialised statically by UATG */\n'
+    for suffix in ('', '_u'):
+        for level in range(1, 5):
+            out += f'PROVIDE(__uatg_pte_l{level}{suffix}_pt = ' \
+                   f'((l{level}{suffix}_pt >> 12) << 10) | 1);\n'
+
+    with open(join(target_dir, 'page_tables.ld'), 'w') as outfile:
+        outfile.write(out)
+
+
 def create_plugins(plugins_path, index_yaml, module):
     """
     This function is used to create Yapsy Plugin files.
@@ -485,6 +511,25 @@ def create_config_file(config_path, jobs, modules, module_dir, work_dir,
           '[uatg]\n\n' \
           '# number of processes to spawn. Default = 1\n' \
           f'jobs = {jobs}\n' \
+          '\n# [True, False] render the tests yielded by a plugin across ' \
+          'all the processes\nfan_out = False\n' \
+          '\n# [True, False] reuse the tests of the plugins which are ' \
+          'unchanged since the previous run\ncache = True\n' \
+          '\n# seed for the random values used by the plugins\nseed =\n' \
+          '\n# [True, False] profile the plugins using cProfile\n' \
+          'profile = False\n' \
+          '\n# [True, False] initialise the page tables statically\n' \
+          'static_pages = False\n' \
+          '\n# [True, False] link the page tables from shared objects\n' \
+          'shared_pages = False\n' \
+          '\n# [True, False] create a build.ninja file for the tests\n' \
+          'ninja = False\n' \
+          '\n# [uatg, make] runner of the syntax check of the tests\n' \
+          'compile_runner = make\n' \
+          '\n# stop the syntax check once as many tests have failed\n' \
+          'max_failures =\n' \
+          '\n# [True, False] write the test_list one entry at a time\n' \
+          'stream_test_list = False\n' \
           '\n# [info, error, debug] set verbosity level to view ' \
           'different levels of messages. ' \
           '\nverbose = info\n\n# [True, False] ' \
@@ -703,14 +748,15 @@ def rvtest_data(bit_width=0, num_vals=20, random=True, signed=False, align=4) \
 
 
 # UATG Functions
-def clean_modules(module_dir, modules):
+def clean_modules(module_dir, modules, index_path=None, optional_index=False):
     """
     Function to read the modules specified by the user, check if they exist or
     raise an error.
     Returns a list of the modules for which tests will be generated.
+    The index file is looked up as in list_of_modules.
     """
     module = None
-    available_modules = list_of_modules(module_dir)
+    available_modules = list_of_modules(module_dir, index_path, optional_index)
 
     if 'all' in modules:
 
@@ -764,48 +810,73 @@ def split_isa_string(isa_string):
     return extension_list
 
 
-def generate_test_list(asm_dir, uarch_dir, module_dir, isa, test_list, compile_macros_dict, self_checking_dict):
+def generate_test_list(work_dir, uarch_dir, modules_dir, isa, records):
     """
-      updates the test_list.yaml file with the location of the
-      tests generated by test_generator as well the directory to dump the logs.
-      Check the test_list format documentation present.
+      yields the entries of the test_list.yaml file for the tests generated by
+      test_generator, as (test name, entry) pairs in the order of the test
+      names. The entries hold the location of the tests as well the directory
+      to dump the logs. records holds the TestRecords of the tests of each
+      module. Check the test_list format documentation present.
       The test list generation is an optional feature which the user may choose
       to use.
     """
-    asm_test_list = glob(asm_dir + '/**/*.S')
     env_dir = join(uarch_dir, 'env/')
-    target_dir = abspath(asm_dir + '/../')
+    target_dir = abspath(work_dir)
 
     extension_list = split_isa_string(isa)
     march = isa.replace('Zihpm','').replace('Zicntr','').replace('Smrnmi','').replace('S','').replace('U','').replace('H','').lower()
     xlen = 32 if '32' in isa else 64
     mabi = 'ilp32' if xlen == 32 else 'lp64'
 
-    for test in asm_test_list:
-        logger.debug(f"Current test is {test}")
-        base_key = basename(test)[:-2]
-        test_list[base_key] = {}
-        test_list[base_key]['generator'] = 'uatg'
-        test_list[base_key]['work_dir'] = abspath(asm_dir + '/' + base_key)
-        test_list[base_key]['isa'] = isa
-        test_list[base_key]['march'] = march
-        test_list[base_key]['mabi'] = mabi
-        test_list[base_key]['cc'] = f'riscv{xlen}-unknown-elf-gcc'
-        test_list[base_key][
-            'cc_args'] = '-mcmodel=medany -static -std=gnu99 -O2 -fno-common ' \
-                         '-fno-builtin-printf -fvisibility=hidden '
-        test_list[base_key][
-            'linker_args'] = '-static -nostdlib -nostartfiles -lm -lgcc -T'
-        test_list[base_key]['linker_file'] = abspath(join(
-            target_dir, 'link.ld'))
-        test_list[base_key]['asm_file'] = abspath(
-            join(asm_dir, base_key, base_key + '.S'))
-        test_list[base_key]['include'] = [env_dir, target_dir, module_dir]
-        test_list[base_key]['compile_macros'] = compile_macros_dict[base_key]
-        test_list[base_key]['extra_compile'] = []
-        test_list[base_key]['result'] = 'Unavailable'
-        test_list[base_key]['self_checking'] = self_checking_dict[base_key]
-    return test_list
+    # the fields derived from the ISA are the same for every test
+    isa_fields = {
+        'generator': 'uatg',
+        'isa': isa,
+        'march': march,
+        'mabi': mabi,
+        'cc': f'riscv{xlen}-unknown-elf-gcc',
+        'cc_args': '-mcmodel=medany -static -std=gnu99 -O2 -fno-common '
+                   '-fno-builtin-printf -fvisibility=hidden ',
+        'linker_args': '-static -nostdlib -nostartfiles -lm -lgcc -T',
+        'linker_file': abspath(join(target_dir, 'link.ld'))
+    }
+    # the entry of every module is built once, with the keys of the tests in
+    # the order of the test_list. The entries of the tests of a module are
+    # filled in from it.
+    module_entries = {
+        module: dict(isa_fields,
+                     work_dir=None,
+                     asm_file=None,
+                     include=[env_dir, target_dir,
+                              join(modules_dir, module)],
+                     compile_macros=None,
+                     extra_compile=None,
+                     result='Unavailable',
+                     self_checking=None) for module in records
+    }
+
+    tests = sorted(((record, module)
+                    for module, module_records in records.items()
+                    for record in module_records),
+                   key=lambda test: test[0].name)
+    for record, module in tests:
+        logger.debug(f"Current test is {record.name}")
+        asm_dir = join(work_dir, module)
+        test_entry = dict(module_entries[module])
+        test_entry['work_dir'] = abspath(join(asm_dir, record.name))
+        test_entry['asm_file'] = abspath(
+            join(asm_dir, record.name, record.name + '.S'))
+        # the entries must not share the list, else it is dumped as an alias
+        test_entry['include'] = list(test_entry['include'])
+        test_entry['compile_macros'] = record.compile_macros
+        # the shared page table objects are built by the makefile only. The
+        # test_list lists their sources, which are compiled with the test.
+        test_entry['extra_compile'] = [
+            splitext(path)[0] + '.S' if path.endswith('.o') else path
+            for path in record.extra_compile
+        ]
+        test_entry['self_checking'] = record.self_checking
+        yield record.name, test_entry
 
 
 def generate_sv_components(sv_dir, alias_file):
@@ -829,43 +900,221 @@ def generate_sv_components(sv_dir, alias_file):
         defines_file.write(defines)
 
 
-def list_of_modules(module_dir):
+def list_of_modules(module_dir, index_path=None, optional_index=False):
     """
     lists the tests modules available by reading the index.yaml file present
-    in the modules directory.
+    in the modules directory, or the index file at index_path.
+    When optional_index is True and there is no index file, the directories
+    of the modules directory which hold tests are listed instead.
     """
     module_list = []
-    if exists(join(module_dir, 'index.yaml')):
-        modules = load_yaml(join(module_dir, 'index.yaml'))
+    index_path = index_path or join(module_dir, 'index.yaml')
+    if exists(index_path):
+        modules = load_yaml(index_path)
         for key, value in modules.items():
             if value is not None:
                 module_list.append(key)
         return module_list
+    elif optional_index:
+        return sorted(
+            module for module in listdir(module_dir)
+            if isdir(join(module_dir, module)) and any(
+                file.startswith('uatg_') and file.endswith('.py')
+                for file in listdir(join(module_dir, module))))
     else:
         logger.error(f"index.yaml not found in {module_dir}")
         exit("FILE_NOT_FOUND")
 
 
-def dump_makefile(isa, link_path, test_path, test_name, env_path, work_dir,
-                  compile_macros):
+def compile_flags(isa, link_path, env_path, work_dir):
+    """
+        returns the compiler and the flags used to compile every test, and to
+        assemble the page tables shared by the tests. These are common to the
+        makefile, the build.ninja and the compile list of the tests.
+    """
     compiler = 'riscv64-unknown-elf-gcc'
     mcmodel = 'medany'
     mabi = 'lp64'
     march = isa.lower()[:8]
-    macros = ''
-
-    if compile_macros:
-        macros = '-D' + ' -D'.join(compile_macros)
 
     flags = '-static -std=gnu99 -O2 -fno-common -fno-builtin-printf ' \
             '-fvisibility=hidden -static -nostdlib -nostartfiles -lm -lgcc'
-    cmd = f'{compiler} -mcmodel={mcmodel} {flags} -march={march} -mabi={mabi}' \
-          f' -lm -lgcc -T {join(link_path, "link.ld")} {test_path}' \
-          f' -I {env_path}' \
-          f' -I {work_dir} {macros}' \
-          f' -o /dev/null'
 
-    return cmd
+    return {
+        'cc': compiler,
+        'cflags': f'-mcmodel={mcmodel} {flags} -march={march} -mabi={mabi}'
+                  f' -lm -lgcc',
+        'asflags': f'-mcmodel={mcmodel} -march={march} -mabi={mabi}',
+        'linker': join(link_path, 'link.ld'),
+        'includes': f'-I {env_path} -I {work_dir}'
+    }
+
+
+def dump_makefile(isa, link_path, env_path, work_dir, modules,
+                  page_tables=()):
+    """
+        returns the makefile which compiles the tests of the modules. The
+        flags shared by every test are defined once, and the tests of each
+        module are listed in the <module>.mk file included by the makefile,
+        as written by dump_module_makefile.
+
+        The page_tables are the shared page table objects linked by the tests,
+        which are assembled by a pattern rule.
+    """
+    flags = compile_flags(isa, link_path, env_path, work_dir)
+
+    lines = [
+        '# the implicit rules of make are not used by the tests, and searching',
+        '# them for every test slows down make.',
+        'MAKEFLAGS += --no-builtin-rules', '.SUFFIXES:', '',
+        f'CC := {flags["cc"]}',
+        f'CFLAGS := {flags["cflags"]}',
+        f'ASFLAGS := {flags["asflags"]}',
+        f'LINKER := {flags["linker"]}',
+        f'INCLUDES := {flags["includes"]}', '',
+        '# compiles the test $@ from the directory of the test, which is the',
+        '# first prerequisite. The other prerequisites of the test are linked',
+        '# along with it, and its compile macros are set in MACROS.',
+        'COMPILE = $(CC) $(CFLAGS) -T $(LINKER) $</$@.S $(filter-out $<,$^)'
+        ' $(INCLUDES) $(MACROS) -o /dev/null', '',
+        'all: ' + ' \\\n\t'.join(modules), ''
+    ]
+    lines.extend(f'include {join(work_dir, module + ".mk")}'
+                 for module in modules)
+    if page_tables:
+        # the shared page tables are assembled once, and linked by the tests
+        lines.extend([
+            '', 'page_tables: ' + ' \\\n\t'.join(sorted(page_tables)), '',
+            '%.o: %.S', '\t$(CC) $(ASFLAGS) -c $< -o $@'
+        ])
+
+    return '\n'.join(lines) + '\n'
+
+
+def dump_module_makefile(module, work_tests_dir, records):
+    """
+        returns the makefile included by the makefile of dump_makefile, which
+        lists the tests of the module. Every test is compiled by a single
+        static pattern rule, and only the compile macros and the extra inputs
+        of each test are written per test.
+    """
+    tests = f'{module}_TESTS'
+    lines = [
+        f'{tests} := ' + ' \\\n\t'.join(record.name for record in records),
+        '', f'{module}: $({tests})', '',
+        f'$({tests}): %: {join(work_tests_dir, "%")}', '\t$(COMPILE)', ''
+    ]
+    for record in records:
+        if record.compile_macros:
+            lines.append(f'{record.name}: MACROS := -D' +
+                         ' -D'.join(record.compile_macros))
+        if record.extra_compile:
+            lines.append(f'{record.name}: ' + ' '.join(record.extra_compile))
+
+    return '\n'.join(lines) + '\n'
+
+
+def dump_ninja(isa, link_path, env_path, work_dir, modules, records,
+               page_tables=()):
+    """
+        returns the build.ninja file which builds the ELF of every test of the
+        modules, using the same flags as the makefile of dump_makefile. The
+        records are the TestRecords of the tests of each module.
+
+        Every test is an edge of its own, and the env headers included by the
+        test are tracked using the depfile written by the compiler. Hence,
+        ninja rebuilds only the tests whose inputs have changed.
+    """
+    flags = compile_flags(isa, link_path, env_path, work_dir)
+
+    lines = [
+        f'cc = {flags["cc"]}',
+        f'cflags = {flags["cflags"]}',
+        f'asflags = {flags["asflags"]}',
+        f'linker = {flags["linker"]}',
+        f'includes = {flags["includes"]}', '',
+        'rule compile',
+        '  command = $cc $cflags -T $linker $in $includes $macros'
+        ' -MD -MT $out -MF $out.d -o $out',
+        '  description = compiling $name',
+        '  depfile = $out.d',
+        '  deps = gcc', '',
+        'rule assemble',
+        '  command = $cc $asflags -c $in -o $out',
+        '  description = assembling $in', ''
+    ]
+    for module in modules:
+        for record in records[module]:
+            test_path = join(work_dir, module, record.name, record.name)
+            lines.append(f'build {test_path}.elf: compile {test_path}.S' +
+                         ''.join(' ' + path for path in record.extra_compile))
+            lines.append(f'  name = {record.name}')
+            if record.compile_macros:
+                lines.append('  macros = -D' +
+                             ' -D'.join(record.compile_macros))
+            lines.append(f'build {record.name}: phony {test_path}.elf')
+        lines.append(f'build {module}: phony ' +
+                     ' '.join(record.name for record in records[module]))
+        lines.append('')
+    if page_tables:
+        # the shared page tables are assembled once, and linked by the tests
+        for path in sorted(page_tables):
+            lines.append(f'build {path}: assemble {splitext(path)[0]}.S')
+        lines.append('build page_tables: phony ' +
+                     ' '.join(sorted(page_tables)))
+        lines.append('')
+    lines.append('build all: phony ' + ' '.join(modules))
+    lines.append('default all')
+
+    return '\n'.join(lines) + '\n'
+
+
+def dump_compile_list(isa, link_path, env_path, work_dir, modules, records,
+                      page_tables=()):
+    """
+        returns the compile list of the tests, which holds the flags of
+        compile_flags along with the source, the compile macros and the extra
+        inputs of every test of the modules. The compile list is read by the
+        compile runner of uatg.test_compiler.
+    """
+    return {
+        'flags': compile_flags(isa, link_path, env_path, work_dir),
+        'page_tables': sorted(page_tables),
+        'tests': [{
+            'name': record.name,
+            'module': module,
+            'source': join(work_dir, module, record.name, record.name + '.S'),
+            'compile_macros': list(record.compile_macros or []),
+            'extra_compile': list(record.extra_compile)
+        } for module in modules for record in records[module]]
+    }
+
+
+def create_shared_page_tables(data, target_dir):
+    """
+        writes the page tables in data, as created by setup_pages, to a source
+        file in the target directory. All the tests whose page tables have the
+        same layout share the source file, which is written only once.
+        Returns the path of the object file of the source, which is to be
+        linked along with the tests. The object is built by the makefile, the
+        build.ninja file or the compile runner, while the test_list lists the
+        source.
+    """
+    name = 'pt_' + sha256(data.encode()).hexdigest()[:16]
+    source_path = join(target_dir, name + '.S')
+    if not exists(source_path):
+        makedirs(target_dir, exist_ok=True)
+        if '.globl' not in data:
+            # the tables are referred to by the tests linking the object
+            data = re.sub(r'^(l\d+(?:_u)?_pt):$', r'.globl \1\n\1:', data,
+                          flags=M)
+        # processes rendering tests with the same layout may race here. Hence,
+        # the source is written to a per process file and moved in place.
+        with open(f'{source_path}.{getpid()}.tmp', 'w') as f:
+            f.write('# page tables shared by the UATG tests with this layout'
+                    f'\n\n.data\n{data}')
+        replace(f'{source_path}.{getpid()}.tmp', source_path)
+    return join(target_dir, name + '.o')
 
 
 def setup_pages(pte_dict,
@@ -881,19 +1130,28 @@ def setup_pages(pte_dict,
                 user_supervisor_superpage=False,
                 fault=False,
                 mem_fault=False,
-                misaligned_superpage=False):
+                misaligned_superpage=False,
+                static=False):
     """
         creates pagetables to run tests in User and Supervisor modes
         Currently works with the sv39 virtual memory addressing.
 
+        By default, the non leaf PTEs are filled by the code of the test at
+        runtime. When static is set, the non leaf PTEs are initialised in the
+        data section instead. The PTE of a table is an absolute symbol defined
+        by the page_tables.ld linker script (see create_page_table_symbols),
+        which is to be linked along with the test.
+
         :param page_size: Size of the pages - 4kiB.
         :param paging_mode: Paging mode used in the tests - sv39, for now.
         :param valid_ll_pages: Valid last level pages to be created.
         :param mode: Mode of execution for which the test is being generated.
+        :param static: Initialise the page tables statically.
         :type page_size: int
         :type paging_mode: string
         :type valid_ll_pages: int
         :type mode: string
+        :type static: bool
         :returns: ([out_code_string], out_data_string)
         :rtype: tuple(list, string)
     """
@@ -915,6 +1173,11 @@ def setup_pages(pte_dict,
             'dirty': True
         }
 
+    if static and page_size != 4096:
+        logger.warning('Static page tables are created only for 4KiB pages. '
+                       'The page tables will be set up at runtime')
+        static = False
+
     entries_per_pt = page_size // 8
     # assuming that the size will always be a power of 2
     power = len(bin(page_size)[2:]) - 1
@@ -1211,6 +1474,63 @@ def setup_pages(pte_dict,
                                 f"\tadd t0, t3, 0 # move address of " \
                                 f"l{i + 1} page into t0\n"
 
+    if static:
+        # the entries stored by the runtime set up above, in the same order,
+        # are initialised in the data section. Only the stores to the labels
+        # used by the trap handler remain in the code.
+        table_entries = {}
+        pte_updation = "\n.option norvc" \
+                       "\n\t# page tables are initialised statically\n"
+        # label and index of the entry, level of the table, suffix of the
+        # user tables, leaf PTE of the superpage and the misaligned flag
+        stores = []
+        for level in range(levels - 1):
+            stores.append(
+                ('l0_pt' if level == 0 else f'l{level}_pt',
+                 int(paging_offset_constant, 16) // (xlen // 8)
+                 if level == 0 else 0, level, '', leaf_pte_s,
+                 not user_superpage))
+        if mode == 'user':
+            for level in range(levels - 1):
+                stores.append(('l0_pt' if level == 0 else f'l{level}_u_pt', 0,
+                               level, '_u', leaf_pte_u, user_superpage))
+
+        for label, index, level, suffix, leaf_pte, misaligned in stores:
+            if leaf_pte and level == spage_level - 1:
+                value = leaf_pte.split(',')[-1].strip()
+            else:
+                value = f'__uatg_pte_l{level + 1}{suffix}_pt'
+            table_entries.setdefault(label, {})[index] = value
+            if level == spage_level - 1 and misaligned_superpage and \
+                    misaligned:
+                slot = f'{label} + {index * (xlen // 8)}' if index else label
+                pte_updation += f"\tla t0, {slot}\n" \
+                                f"{data_for_misaligned_test}"
+
+        def static_table(label):
+            table = f'.globl {label}\n{label}:\n'
+            filled = 0
+            for index, value in sorted(table_entries.get(label, {}).items()):
+                if index > filled:
+                    table += f'.rept {index - filled}\n{word_fill} 0x0\n.endr\n'
+                table += f'{word_fill} {value}\n'
+                filled = index + 1
+            return table + f'.rept {entries - filled}\n{word_fill} 0x0\n' \
+                           f'.endr\n'
+
+        initial_level_pages_s = ''.join(
+            static_table(f'l{level}_pt') for level in range(levels - 1))
+        ll_page_s = f'.globl l{levels - 1}_pt\n' + ll_page_s
+        if mode == 'user':
+            initial_level_pages_u = ''.join(
+                static_table(f'l{level}_u_pt')
+                for level in range(1, levels - 1))
+            ll_page_u = f'.globl l{levels - 1}_u_pt\n' + ll_page_u
+        out_data_string = pre + initial_level_pages_s + ll_page_s + \
+                          initial_level_pages_u + ll_page_u
+
+        pte_updation += "\n"
+
     if (terapage == True) or (petapage == True):
         a0_reg = 0
     else:
@@ -1313,9 +1633,64 @@ def setup_pages(pte_dict,
     return out_code_string, out_data_string
 
 
+def page_setup_key(page_setup):
+    """
+        returns a hashable key of the arguments of setup_pages. The default
+        values of the arguments are filled in, so that the same page tables
+        always have the same key. All the machine mode tests share one key, as
+        they have no page tables.
+    """
+    arguments = signature(setup_pages).bind(**page_setup)
+    arguments.apply_defaults()
+    arguments = dict(arguments.arguments)
+    if arguments['mode'] == 'machine':
+        return ('mode', 'machine'), ('pte_dict', None)
+    if arguments['pte_dict'] is not None:
+        arguments['pte_dict'] = tuple(sorted(arguments['pte_dict'].items()))
+    return tuple(sorted(arguments.items()))
+
+
+@lru_cache(maxsize=128)
+def build_pages(key, cache_dir=None):
+    """
+        returns the page table code and data for a key from page_setup_key.
+        When cache_dir is specified, the page tables are also looked up in, and
+        stored to, the directory.
+    """
+    path = None
+    if cache_dir:
+        path = join(
+            cache_dir,
+            sha256(repr((__version__, key)).encode()).hexdigest() + '.json')
+        cached = load_json_cache(path)
+        if cached:
+            return tuple(cached['code']), cached['data']
+
+    arguments = dict(key)
+    if arguments.get('pte_dict') is not None:
+        arguments['pte_dict'] = dict(arguments['pte_dict'])
+    code, data = setup_pages(**arguments)
+
+    if path:
+        dump_json_cache(path, {'code': list(code), 'data': data})
+    return tuple(code), data
+
+
+def memoized_setup_pages(page_setup, cache_dir=None):
+    """
+        returns the output of setup_pages(**page_setup). setup_pages depends
+        only on its arguments. Hence, the page tables are built once per
+        process for every distinct set of arguments, and optionally persisted
+        in cache_dir to be reused by later runs.
+    """
+    return build_pages(page_setup_key(page_setup), cache_dir)
+
+
 def run_make(work_dir, jobs):
     """
-        function to invoke the empty compilation makefile
+        function to invoke the empty compilation makefile. The build.ninja
+        file is used instead, when it is present in the work directory and
+        ninja is available.
 
         :param work_dir: path to the work directory
         :param jobs: number of parallel processes for the make utility to spawn
@@ -1325,18 +1700,24 @@ def run_make(work_dir, jobs):
     cwd = getcwd()
     chdir(abspath(work_dir))
     logger.debug(f'Current directory is: {work_dir}')
-    logger.info(f'Invoking makefile to perform an empty compilation')
+    if isfile('build.ninja') and which('ninja'):
+        logger.info(f'Invoking ninja to build the tests')
+        cmd = f'ninja -j{jobs}'
+    else:
+        logger.info(f'Invoking makefile to perform an empty compilation')
+        cmd = f'make -j{jobs}'
     logger.warning(f'Based on the number of tests and their size, '
                    f'this step might take a lot of time.')
 
     try:
-        out = run(split(f'make -j{jobs}'), check=True, stdout=PIPE, stderr=PIPE)
+        out = run(split(cmd), check=True, stdout=PIPE, stderr=PIPE)
         logger.debug(out.stdout.decode('ascii'))
         logger.info('All the generated Assmebly files are syntatically correct')
         logger.info('Empty Syntax Check - Complete! No errors found.')
 
     except CalledProcessError as e:
-        logger.error(e.stderr.decode('ascii'))
+        # ninja reports the errors of the compiler on its stdout
+        logger.error(e.stdout.decode('ascii') + e.stderr.decode('ascii'))
         logger.warning(f'Please fix the errors and re-generate the tests')
         logger.info('Empty Syntax Check - Complete! Error found.')
 
@@ -1402,17 +1783,193 @@ def select_paging_modes(paging_modes):
 
 def macros_parser(_path=[join(dirname(__file__), 'env/arch_test_unpriv.h'),
                          join(dirname(__file__), 'env/arch_test_priv.h')]):
-    
-    macros = []
+    """
+        returns the list of the macros tested by the conditionals of the
+        headers in _path.
+    """
+    return list(compile_macro_index(_path))
 
-    for arch_test_path in _path:
 
-        with open(arch_test_path, 'r') as f:
-            lines = f.readlines()
-        for line in lines:
-            if '#ifdef' in line:
-                pref = line[0:line.find('#ifdef')]
-                if '//' not in pref and '/*' not in pref:
-                    macros.append(line[line.find('#ifdef') + 6:].strip('\n '))
-    
-    return list(set(macros))
+# macros tested by the conditionals of a header, keyed by the path and the
+# modification time of the header.
+header_macros = {}
+
+
+def parse_header_macros(path):
+    """
+        returns the set of the macros tested by the #ifdef, #ifndef, #if and
+        #elif directives of a header, at any level of nesting. Commented out
+        directives are ignored.
+    """
+    with open(path, 'r') as f:
+        text = f.read()
+
+    # remove the comments and join the continued lines
+    text = re.sub(r'/\*.*?\*/', ' ', text, flags=re.S)
+    text = re.sub(r'//[^\n]*', '', text)
+    text = text.replace('\\\n', ' ')
+
+    macros = set()
+    for directive, expression in re.findall(
+            r'^[ \t]*#[ \t]*(ifdef|ifndef|if|elif)\b(.*)$', text, re.M):
+        names = re.findall(r'\b[A-Za-z_]\w*', expression)
+        if directive in ('ifdef', 'ifndef'):
+            macros.update(names[:1])
+        else:
+            # the operands of defined(...) and the macros compared in #if
+            macros.update(name for name in names if name != 'defined')
+    return macros
+
+
+def compile_macro_index(paths):
+    """
+        returns the set of the compile macros which are understood by the
+        headers in paths. A header is parsed again only when it is modified.
+    """
+    macros = set()
+    for path in paths:
+        key = (abspath(path), getmtime(path))
+        if key not in header_macros:
+            header_macros[key] = frozenset(parse_header_macros(path))
+        macros |= header_macros[key]
+    return frozenset(macros)
+
+
+def file_hash(paths):
+    """
+        returns the sha256 hex digest of the contents of the files in paths.
+    """
+    digest = sha256()
+    for path in paths:
+        digest.update(path.encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def module_hash(module_dir):
+    """
+        returns the sha256 hex digest of the helper python files and of the
+        skeleton of a module, which are shared by all the plugins of the module.
+    """
+    return file_hash(
+        sorted(
+            join(module_dir, file)
+            for file in listdir(module_dir)
+            if (file.endswith('.py') and not file.startswith('uatg_')) or
+            file == 'skeleton.yaml'))
+
+
+def config_hash(config_dict):
+    """
+        returns the sha256 hex digest of the DUT configuration. The keys of the
+        dictionaries are sorted, so that the digest does not depend on the
+        order of the entries in the YAML files.
+    """
+
+    def normalize(node):
+        if isinstance(node, dict):
+            return sorted((str(k), normalize(v)) for k, v in node.items())
+        if isinstance(node, (list, tuple)):
+            return [normalize(v) for v in node]
+        return repr(node)
+
+    return sha256(repr(normalize(config_dict)).encode()).hexdigest()
+
+
+def load_json_cache(path):
+    """
+        loads a cache file written by dump_json_cache. An empty dictionary is
+        returned when the file is missing or unreadable.
+    """
+    try:
+        with open(path, 'r') as f:
+            return load(f)
+    except (OSError, ValueError):
+        logger.debug(f'No usable cache at {path}')
+        return {}
+
+
+def dump_json_cache(path, data):
+    """
+        writes the cache data to path. The file is replaced atomically, so that
+        an interrupted run never leaves behind a partially written cache, and
+        concurrent writers never see each other's partial files.
+    """
+    makedirs(dirname(path), exist_ok=True)
+    # every writer uses its own temporary file, as the workers of a pool may
+    # write the same cache file at once. Their contents are the same, so the
+    # last rename wins harmlessly.
+    fd, tmp_path = mkstemp(dir=dirname(path), suffix='.tmp')
+    try:
+        with open(fd, 'w') as f:
+            dump(data, f)
+        replace(tmp_path, path)
+    finally:
+        if exists(tmp_path):
+            remove(tmp_path)
+
+
+def peak_rss():
+    """
+        returns the peak resident set size of the current process in KiB.
+    """
+    return getrusage(RUSAGE_SELF).ru_maxrss
+
+
+def rss_stats(peak_at_start):
+    """
+        returns the memory stats of a task run by a worker, given the peak RSS
+        of the worker when the task started. The peak RSS of a worker never
+        goes down, so it is reported as the peak of the worker, along with the
+        growth of the peak during the task, which the task alone caused.
+    """
+    worker_peak = peak_rss()
+    return {
+        'worker_peak_rss_kib': worker_peak,
+        'peak_rss_growth_kib': worker_peak - peak_at_start
+    }
+
+
+def dump_timing_report(path, stats, top=5):
+    """
+        writes the timing report of the plugins to path.json and path.csv and
+        logs the plugins which took the longest.
+        stats is a list of dictionaries, one per plugin, with the module and
+        plugin names, the time (in seconds) spent in every phase and,
+        optionally, a list of the per test timings under the 'tests' key.
+    """
+    makedirs(dirname(path), exist_ok=True)
+    with open(path + '.json', 'w') as f:
+        dump(stats, f, indent=2)
+
+    rows = []
+    for plugin_stats in stats:
+        rows.append({k: v for k, v in plugin_stats.items() if k != 'tests'})
+        for test_stats in plugin_stats.get('tests', []):
+            rows.append({
+                'module': plugin_stats['module'],
+                'plugin': plugin_stats['plugin'],
+                **test_stats
+            })
+    fields = ['module', 'plugin', 'test']
+    for row in rows:
+        fields += [k for k in row if k not in fields]
+    with open(path + '.csv', 'w', newline='') as f:
+        writer = DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    logger.debug(f'Timing report written to {path}.json and {path}.csv')
+
+    logger.info(f'\n****** Slowest plugins (top {top}) ******')
+    slowest = sorted(stats, key=lambda x: x['wall'], reverse=True)[:top]
+    for s_no, plugin_stats in enumerate(slowest, 1):
+        phases = ', '.join(
+            f'{k} {v:.3f}s' for k, v in plugin_stats.items()
+            if k not in ('module', 'plugin', 'wall', 'worker_peak_rss_kib',
+                         'peak_rss_growth_kib', 'tests'))
+        logger.info(f'{s_no} | {plugin_stats["module"]}/'
+                    f'{plugin_stats["plugin"]} : {plugin_stats["wall"]:.3f}s '
+                    f'({phases}), worker peak RSS '
+                    f'{plugin_stats["worker_peak_rss_kib"]} KiB (+'
+                    f'{plugin_stats["peak_rss_growth_kib"]} KiB)')